@@ -0,0 +1,36 @@
+"""Add scheduled_at_utc to tasks for reminder window queries.
+
+Revision ID: 202503010900
+Revises: 202502150930
+Create Date: 2025-03-01 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202503010900"
+down_revision: Union[str, None] = "202502150930"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("scheduled_at_utc", sa.DateTime(timezone=True), nullable=True))
+    connection = op.get_bind()
+    # Existing rows carry the offset their timetz was stored with; the ORM keeps that same rule on later
+    # updates and pins new naive times to the scheduler zone before writing them.
+    connection.execute(
+        sa.text(
+            "UPDATE tasks SET scheduled_at_utc = scheduled_day + scheduled_time "
+            "WHERE scheduled_day IS NOT NULL AND scheduled_time IS NOT NULL"
+        )
+    )
+    op.create_index("ix_tasks_scheduled_at_utc_completed", "tasks", ["scheduled_at_utc", "completed"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_scheduled_at_utc_completed", table_name="tasks")
+    op.drop_column("tasks", "scheduled_at_utc")
@@ -0,0 +1,38 @@
+"""Add partial index for active resolutions ordered by recency.
+
+Revision ID: 202503080900
+Revises: 202503010900
+Create Date: 2025-03-08 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202503080900"
+down_revision: Union[str, None] = "202503010900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_resolutions_user_active_updated",
+            "resolutions",
+            ["user_id", sa.text("updated_at DESC")],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_resolutions_user_active_updated",
+            table_name="resolutions",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,24 @@
+"""Add composite index on tasks (user_id, scheduled_day).
+
+Revision ID: 202503150900
+Revises: 202503080900
+Create Date: 2025-03-15 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202503150900"
+down_revision: Union[str, None] = "202503080900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tasks_user_id_scheduled_day", "tasks", ["user_id", "scheduled_day"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_id_scheduled_day", table_name="tasks")
@@ -0,0 +1,29 @@
+"""Add index for latest-snapshot lookups on agent_actions_log.
+
+Revision ID: 202503290900
+Revises: 202503220900
+Create Date: 2025-03-29 09:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202503290900"
+down_revision: Union[str, None] = "202503220900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_agent_actions_log_user_type_created",
+        "agent_actions_log",
+        ["user_id", "action_type", sa.text("created_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_actions_log_user_type_created", table_name="agent_actions_log")
@@ -27,6 +27,8 @@ class Settings(BaseSettings):
     notifications_enabled: bool = False
     notifications_provider: str = "noop"
     openai_api_key: Optional[str] = None
+    llm_concurrency: int = 4
+    skip_llm_for_empty_cohort: bool = True
     task_reminder_interval_minutes: int = 5
     task_reminder_lookahead_minutes: int = 30
     expo_push_url: str = "https://exp.host/--/api/v2/push/send"
@@ -12,7 +12,24 @@ from app.db.types import JSONBCompat
 
 class AgentActionLog(Base):
     __tablename__ = "agent_actions_log"
-    __table_args__ = (Index("ix_agent_actions_log_user_id", "user_id"),)
+    __table_args__ = (
+        Index("ix_agent_actions_log_user_id", "user_id"),
+        # Weekly snapshot dedupe looks up a user's log for one week window.
+        Index(
+            "ix_agent_actions_log_user_week",
+            "user_id",
+            "action_type",
+            sa_text("(action_payload ->> 'week_start')"),
+            sa_text("(action_payload ->> 'week_end')"),
+        ),
+        # Latest snapshot of a given type per user (weekly plan / intervention history).
+        Index(
+            "ix_agent_actions_log_user_type_created",
+            "user_id",
+            "action_type",
+            sa_text("created_at DESC"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -12,7 +12,16 @@ from app.db.types import JSONBCompat
 
 class Resolution(Base):
     __tablename__ = "resolutions"
-    __table_args__ = (Index("ix_resolutions_user_id", "user_id"),)
+    __table_args__ = (
+        Index("ix_resolutions_user_id", "user_id"),
+        # Serves the reminder job's "latest active goals per user" lookup.
+        Index(
+            "ix_resolutions_user_active_updated",
+            "user_id",
+            sa_text("updated_at DESC"),
+            postgresql_where=sa_text("status = 'active'"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -1,11 +1,14 @@
 """Task ORM model."""
 from __future__ import annotations
 
+from datetime import date, datetime, time, timezone
 from uuid import uuid4
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, Text, Time, func, text as sa_text
+from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, Text, Time, event, func, text as sa_text
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.core.config import settings
 from app.db.base import Base
 from app.db.types import JSONBCompat
 
@@ -16,6 +19,8 @@ class Task(Base):
         Index("ix_tasks_user_id", "user_id"),
         Index("ix_tasks_resolution_id", "resolution_id"),
         Index("ix_tasks_completed", "completed"),
+        Index("ix_tasks_scheduled_at_utc_completed", "scheduled_at_utc", "completed"),
+        Index("ix_tasks_user_id_scheduled_day", "user_id", "scheduled_day"),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -28,6 +33,8 @@ class Task(Base):
     title = Column(Text, nullable=False)
     scheduled_day = Column(Date, nullable=True)
     scheduled_time = Column(Time(timezone=True), nullable=True)
+    # Denormalized UTC instant of scheduled_day + scheduled_time so reminder windows can be queried in SQL.
+    scheduled_at_utc = Column(DateTime(timezone=True), nullable=True)
     duration_min = Column(Integer, nullable=True)
     completed = Column(Boolean, nullable=False, server_default=sa_text("false"))
     completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -40,3 +47,30 @@ class Task(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+
+def localize_scheduled_time(day: date | None, scheduled_time: time | None) -> time | None:
+    """Pin a naive time to the scheduler zone's UTC offset on ``day``.
+
+    Postgres stores a naive value in the timetz column with the session's zone, which need not be the
+    scheduler zone; writing an explicit offset keeps the stored time and scheduled_at_utc on one rule.
+    """
+    if scheduled_time is None or scheduled_time.tzinfo is not None:
+        return scheduled_time
+    local_dt = datetime.combine(day or date.today(), scheduled_time, tzinfo=ZoneInfo(settings.scheduler_timezone))
+    return scheduled_time.replace(tzinfo=timezone(local_dt.utcoffset()))
+
+
+def scheduled_at_utc_for(day: date | None, scheduled_time: time | None) -> datetime | None:
+    """Combine a scheduled day/time into a UTC instant, treating naive times as scheduler-local."""
+    if not day or not scheduled_time:
+        return None
+    local_dt = datetime.combine(day, localize_scheduled_time(day, scheduled_time))
+    return local_dt.astimezone(timezone.utc)
+
+
+@event.listens_for(Task, "before_insert")
+@event.listens_for(Task, "before_update")
+def _sync_scheduled_at_utc(mapper, connection, target: Task) -> None:
+    target.scheduled_time = localize_scheduled_time(target.scheduled_day, target.scheduled_time)
+    target.scheduled_at_utc = scheduled_at_utc_for(target.scheduled_day, target.scheduled_time)
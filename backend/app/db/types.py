@@ -1,8 +1,10 @@
 """Database column type helpers."""
 from __future__ import annotations
 
+from sqlalchemy import literal
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.types import JSON, TypeDecorator
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import JSON, Text, TypeDecorator
 
 
 class JSONBCompat(TypeDecorator):
@@ -15,3 +17,11 @@ class JSONBCompat(TypeDecorator):
         if dialect.name == "sqlite":  # pragma: no cover - dialect specific
             return dialect.type_descriptor(JSON())
         return dialect.type_descriptor(JSONB())
+
+
+def json_field_text(column, key: str) -> ColumnElement:
+    """``column ->> key``: a top-level JSON field as text on both Postgres and SQLite (3.38+).
+
+    Written as a plain operator so it matches expression indexes declared as ``(column ->> 'key')``.
+    """
+    return column.op("->>", return_type=Text)(literal(key, Text))
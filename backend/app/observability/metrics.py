@@ -20,3 +20,23 @@ def log_metric(name: str, value: float | int, metadata: Optional[Dict[str, Any]]
             pass
     except Exception as exc:  # pragma: no cover - defensive
         logger.debug("Unable to record metric %s: %s", name, exc)
+
+
+def log_metrics(name: str, values: Dict[str, float | int], metadata: Optional[Dict[str, Any]] = None) -> None:
+    """Log several related metrics to Opik as a single trace.
+
+    Metric values and metadata share one flat mapping, so a metadata key that reuses a metric name is
+    rejected rather than silently replacing the value.
+    """
+    payload: Dict[str, Any] = dict(values)
+    if metadata:
+        collisions = payload.keys() & metadata.keys()
+        if collisions:
+            raise ValueError(f"Metric metadata keys collide with metric names: {sorted(collisions)}")
+        payload.update(metadata)
+
+    try:
+        with trace(name=f"metric:{name}", metadata=payload):
+            pass
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.debug("Unable to record metrics %s: %s", name, exc)
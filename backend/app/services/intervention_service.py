@@ -16,6 +16,7 @@ from app.db.models.agent_action_log import AgentActionLog
 from app.db.models.user import User
 from app.db.models.task import Task
 from app.db.models.resolution import Resolution
+from app.db.types import json_field_text
 from app.core.config import settings
 from zoneinfo import ZoneInfo
 
@@ -140,18 +141,17 @@ def _find_existing_snapshot(
     week_start: str,
     week_end: str,
 ) -> AgentActionLog | None:
-    logs = (
+    return (
         db.query(AgentActionLog)
-        .filter(AgentActionLog.user_id == user_id, AgentActionLog.action_type == action_type)
+        .filter(
+            AgentActionLog.user_id == user_id,
+            AgentActionLog.action_type == action_type,
+            json_field_text(AgentActionLog.action_payload, "week_start") == week_start,
+            json_field_text(AgentActionLog.action_payload, "week_end") == week_end,
+        )
         .order_by(AgentActionLog.created_at.desc())
-        .limit(100)
-        .all()
+        .first()
     )
-    for log in logs:
-        payload = log.action_payload or {}
-        if payload.get("week_start") == week_start and payload.get("week_end") == week_end:
-            return log
-    return None
 
 
 def _collect_slippage_stats(tasks: List[Task]) -> Dict[str, float | int]:
@@ -13,6 +13,7 @@ from app.db.models.user_preferences import UserPreferences
 from app.services.weekly_planner import (
     get_weekly_plan_preview,
     persist_weekly_plan_preview,
+    run_weekly_planning_for_users,
 )
 from app.services.intervention_service import (
     get_intervention_preview,
@@ -76,23 +77,28 @@ def run_weekly_plan_for_all_users(
 ) -> JobRunResult:
     ids = _normalize_user_ids(user_ids, db)
     prefs_map = _load_preferences_map(db, ids)
-    users_processed = 0
-    snapshots_written = 0
     skipped = 0
+    eligible: List[UUID] = []
     for uid in ids:
         prefs = prefs_map.get(uid, DEFAULT_PREFS)
         if prefs.coaching_paused or not prefs.weekly_plans_enabled:
             skipped += 1
             logger.debug("Skipping weekly plan for user %s due to preferences", uid)
             continue
+        eligible.append(uid)
+
+    # Planner LLM calls for all eligible users run concurrently; failures are logged per user.
+    results = run_weekly_planning_for_users(db, eligible, force=force)
+    users_processed = len(results)
+    snapshots_written = 0
+    for result in results.values():
+        if not result.created:
+            continue
+        snapshots_written += 1
         try:
-            created = run_weekly_plan_for_user(db, uid, force=force)
+            notify_weekly_plan_snapshot(db, result.log, None)
         except Exception:  # pragma: no cover - defensive guard
-            logger.exception("Weekly plan job failed for user %s", uid)
-            continue
-        users_processed += 1
-        if created:
-            snapshots_written += 1
+            logger.exception("Weekly plan notification failed for user %s", result.log.user_id)
     return JobRunResult(users_processed=users_processed, snapshots_written=snapshots_written, skipped_due_to_preferences=skipped)
 
 
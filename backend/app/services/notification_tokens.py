@@ -1,7 +1,7 @@
 """Helper functions for managing notification tokens."""
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Sequence
 from uuid import UUID
 
 from sqlalchemy.orm import Session
@@ -67,3 +67,18 @@ def fetch_user_tokens(db: Session, user_id: UUID) -> list[NotificationToken]:
         .filter(NotificationToken.user_id == user_id, NotificationToken.active.is_(True))
         .all()
     )
+
+
+def fetch_tokens_for_users(db: Session, user_ids: Sequence[UUID]) -> dict[UUID, list[NotificationToken]]:
+    """Load active tokens for many users in one query, grouped by user id."""
+    grouped: dict[UUID, list[NotificationToken]] = {}
+    if not user_ids:
+        return grouped
+    rows = (
+        db.query(NotificationToken)
+        .filter(NotificationToken.user_id.in_(list(user_ids)), NotificationToken.active.is_(True))
+        .all()
+    )
+    for row in rows:
+        grouped.setdefault(row.user_id, []).append(row)
+    return grouped
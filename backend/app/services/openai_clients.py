@@ -0,0 +1,17 @@
+"""OpenAI client construction shared by the LLM-backed services."""
+from __future__ import annotations
+
+import httpx
+import openai
+
+# Scheduler jobs wait on these calls, so a stalled request must fail well before the SDK's 600s default.
+_REQUEST_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_MAX_RETRIES = 2
+
+
+def build_openai_client(api_key: str) -> openai.OpenAI:
+    return openai.OpenAI(api_key=api_key, timeout=_REQUEST_TIMEOUT, max_retries=_MAX_RETRIES)
+
+
+def build_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    return openai.AsyncOpenAI(api_key=api_key, timeout=_REQUEST_TIMEOUT, max_retries=_MAX_RETRIES)
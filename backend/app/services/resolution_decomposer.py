@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
 from datetime import date, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
+import httpx
 import openai
 from pydantic import BaseModel, Field
 
@@ -360,16 +361,91 @@ WEEKLY_FOCUS_FALLBACKS = [
     "Reflect, adjust, and celebrate the micro wins.",
 ]
 
+# Empirical upper bound for a plan JSON: fixed envelope plus one milestone/week section per week.
+PLAN_BASE_COMPLETION_TOKENS = 400
+PLAN_COMPLETION_TOKENS_PER_WEEK = 180
 
+
+def _build_specialty_matchers() -> Tuple[Tuple[str, Tuple[str, ...], frozenset[str]], ...]:
+    """Freeze (key, keywords, allowed types) for every keyword-driven specialty, in declaration order."""
+    return tuple(
+        (key, tuple(config["keywords"]), frozenset(config.get("types") or ()))
+        for key, config in SPECIALTY_CONFIG.items()
+        if config.get("keywords")
+    )
+
+
+# Specialty priority follows SPECIALTY_CONFIG declaration order; earlier entries win ties.
+_SPECIALTY_MATCHERS = _build_specialty_matchers()
+
+
+GOAL_FOCUS_PLACEHOLDER = "{goal_focus}"
+
+
+def _compile_template_text(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Split template text around the goal placeholder so rendering is a single join."""
+    if value is None:
+        return None
+    return tuple(value.split(GOAL_FOCUS_PLACEHOLDER))
+
+
+def _render_template_parts(parts: Optional[Tuple[str, ...]], goal_focus: str) -> Optional[str]:
+    if parts is None:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    return goal_focus.join(parts)
+
+
+def _compile_specialty_tasks() -> Dict[str, Tuple[Dict[str, Any], ...]]:
+    compiled: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+    for key, config in SPECIALTY_CONFIG.items():
+        templates = config.get("tasks") or SPECIALTY_CONFIG["generic"]["tasks"]
+        compiled[key] = tuple(
+            {
+                "title": _compile_template_text(template.get("title", "Week task")),
+                "intent": _compile_template_text(template.get("intent", "Focus intentionally.")),
+                "note": _compile_template_text(template.get("note")),
+                "duration": template.get("duration"),
+                "cadence": template.get("cadence"),
+            }
+            for template in templates
+        )
+    return compiled
+
+
+_COMPILED_SPECIALTY_TASKS = _compile_specialty_tasks()
+
+
+@lru_cache(maxsize=512)
+def _rendered_fallback_tasks(
+    specialty_key: str,
+    goal_focus: str,
+    resolution_type: Optional[str],
+) -> Tuple[Tuple[str, str, int, Any, Optional[str]], ...]:
+    """Render (title, intent, duration, cadence, note) rows for a specialty's fallback tasks."""
+    task_templates = _COMPILED_SPECIALTY_TASKS.get(specialty_key) or _COMPILED_SPECIALTY_TASKS["generic"]
+    return tuple(
+        (
+            _render_template_parts(template["title"], goal_focus),
+            _render_template_parts(template["intent"], goal_focus),
+            int(template["duration"] or _default_duration(resolution_type)),
+            template["cadence"] or _default_cadence(resolution_type),
+            _render_template_parts(template["note"], goal_focus),
+        )
+        for template in task_templates
+    )
+
+
+@lru_cache(maxsize=512)
 def _detect_specialty_key(user_input: str | None, resolution_type: Optional[str]) -> str:
     text = (user_input or "").lower()
     normalized_type = (resolution_type or "").lower()
-    for key, config in SPECIALTY_CONFIG.items():
-        keywords = config.get("keywords")
-        types = config.get("types")
-        if keywords and any(keyword in text for keyword in keywords):
-            if not types or not normalized_type or normalized_type in types:
-                return key
+    for key, keywords, types in _SPECIALTY_MATCHERS:
+        if types and normalized_type and normalized_type not in types:
+            continue
+        if any(keyword in text for keyword in keywords):
+            return key
     return TYPE_DEFAULT_TEMPLATE.get(normalized_type, "generic")
 
 
@@ -486,6 +562,24 @@ def _render_goal_requirements(refined_goal: Dict[str, Any], *, for_specialty: bo
     return ""
 
 
+def _get_client() -> Optional[openai.OpenAI]:
+    """Return the decomposer's OpenAI client, or None while no API key is configured."""
+    api_key = settings.openai_api_key
+    if not api_key:
+        return None
+    return _client_for(api_key)
+
+
+@lru_cache(maxsize=1)
+def _client_for(api_key: str) -> openai.OpenAI:
+    # Keyed on the API key so a rotated key gets a fresh client; decompose calls share its connection pool.
+    return openai.OpenAI(
+        api_key=api_key,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        max_retries=2,
+    )
+
+
 def decompose_resolution_with_llm(
     user_input: str,
     duration_weeks: int,
@@ -518,8 +612,7 @@ def decompose_resolution_with_llm(
     planning_context.setdefault("availability_profile", availability)
     planning_context.setdefault("resolution_domain", domain_label)
     planning_context.setdefault("resolution_category", resolution_category)
-    api_key = settings.openai_api_key
-    client = openai.OpenAI(api_key=api_key) if api_key else None
+    client = _get_client()
     if not client:
         print("OPENAI_API_KEY missing; using fallback plan.")
         plan_dict = _fallback_plan(
@@ -563,6 +656,8 @@ def decompose_resolution_with_llm(
         availability_profile=availability,
         resolution_category=resolution_category,
     )
+    # Repair/regenerate/fallback can land on a plan that was already scored in this request.
+    evaluation_cache: Dict[str, EvaluationResult] = {}
     plan_dict = _generate_plan_via_llm(
         client,
         system_prompt,
@@ -575,7 +670,7 @@ def decompose_resolution_with_llm(
     )
     plan_dict = _apply_availability_rules_to_plan(plan_dict, domain_label, resolution_category, availability)
     print(f"Plan dict: {plan_dict}")
-    evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal)
+    evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal, evaluation_cache)
     print(f"Evaluation: {evaluation}")
     repair_used = False
     regenerate_used = False
@@ -598,7 +693,7 @@ def decompose_resolution_with_llm(
         if repaired:
             plan_dict = repaired
             plan_dict = _apply_availability_rules_to_plan(plan_dict, domain_label, resolution_category, availability)
-            evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal)
+            evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal, evaluation_cache)
 
     if not evaluation.passed and client:
         regenerate_used = True
@@ -617,7 +712,7 @@ def decompose_resolution_with_llm(
         if regenerated:
             plan_dict = regenerated
             plan_dict = _apply_availability_rules_to_plan(plan_dict, domain_label, resolution_category, availability)
-            evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal)
+            evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal, evaluation_cache)
 
     if not evaluation.passed:
         fallback_used = True
@@ -633,7 +728,7 @@ def decompose_resolution_with_llm(
             refined_goal,
         )
         plan_dict = _apply_availability_rules_to_plan(plan_dict, domain_label, resolution_category, availability)
-        evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal)
+        evaluation = _evaluate_with_observability(plan_dict, band_label, resolution_type, request_id, trace_metadata, refined_goal, evaluation_cache)
 
     return _finalize_plan(plan_dict, evaluation, band_label, band_rationale, repair_used, regenerate_used, fallback_used)
 
@@ -750,17 +845,33 @@ def _generate_plan_via_llm(
         completion = client.chat.completions.create(
             model="gpt-4o",
             response_format={"type": "json_object"},
+            max_tokens=_plan_completion_token_budget(target_weeks),
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
     )
     content = completion.choices[0].message.content or "{}"
-    plan = ResolutionPlan.model_validate_json(content)
-    plan_dict = plan.model_dump()
+    plan_dict = _plan_dict_from_content(content)
     return _post_process_plan(plan_dict, resolution_type, user_context, target_weeks)
 
 
+def _plan_completion_token_budget(target_weeks: Optional[int]) -> int:
+    """Cap generation length to what a plan of the requested size needs."""
+    weeks = max(4, min(12, target_weeks or 12))
+    return PLAN_BASE_COMPLETION_TOKENS + PLAN_COMPLETION_TOKENS_PER_WEEK * weeks
+
+
+def _plan_dict_from_content(content: str) -> Dict[str, Any]:
+    """Validate raw LLM JSON and return the plan as plain dicts.
+
+    The validated dump is kept (rather than the raw JSON dict) so defaults and type coercion
+    still apply; serializer warnings are skipped since the data was just validated.
+    """
+    plan = ResolutionPlan.model_validate_json(content)
+    return plan.model_dump(mode="python", warnings=False)
+
+
 def _repair_plan_via_llm(
     client,
     system_prompt: str,
@@ -783,14 +894,14 @@ def _repair_plan_via_llm(
             completion = client.chat.completions.create(
                 model="gpt-4o",
                 response_format={"type": "json_object"},
+                max_tokens=_plan_completion_token_budget(target_weeks),
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": repair_prompt},
                 ],
             )
         content = completion.choices[0].message.content or "{}"
-        plan = ResolutionPlan.model_validate_json(content)
-        plan_dict = plan.model_dump()
+        plan_dict = _plan_dict_from_content(content)
         return _post_process_plan(plan_dict, resolution_type, user_context, target_weeks)
     except Exception:  # pragma: no cover - defensive
         return None
@@ -1018,10 +1129,17 @@ def _evaluate_with_observability(
     request_id: Optional[str],
     trace_metadata: Dict[str, Any],
     goal_requirements: Dict[str, Any],
+    cache: Optional[Dict[str, EvaluationResult]] = None,
 ) -> EvaluationResult:
+    metadata = {"band": band_label}
+    cache_key = json.dumps(plan_dict, sort_keys=True, default=str) if cache is not None else None
+    if cache_key is not None and cache_key in cache:
+        log_metric("plan.eval.cache_hit", 1, metadata)
+        return cache[cache_key]
     with trace("plan.evaluate", metadata=trace_metadata, request_id=request_id):
         result = evaluate_plan(plan_dict, band_label, resolution_type, goal_requirements)
-    metadata = {"band": band_label}
+    if cache_key is not None:
+        cache[cache_key] = result
     log_metric("plan.eval.score", result.score, metadata)
     log_metric("plan.eval.passed", 1 if result.passed else 0, metadata)
     log_metric("plan.eval.vagueness_count", len(result.vagueness_flags), metadata)
@@ -1045,9 +1163,15 @@ def _finalize_plan(
     summary["regenerate_used"] = regenerate_used
     summary["fallback_used"] = fallback_used
     plan_dict["evaluation_summary"] = summary
-    plan_dict["week_1_tasks"] = [_public_task_data(task) for task in plan_dict.get("week_1_tasks", [])]
+    week_1_tasks = plan_dict.get("week_1_tasks", [])
+    for task in week_1_tasks:
+        _public_task_data(task)
     for section in plan_dict.get("weeks", []):
-        section["tasks"] = [_public_task_data(task) for task in section.get("tasks", [])]
+        tasks = section.get("tasks", [])
+        if tasks is week_1_tasks:
+            continue
+        for task in tasks:
+            _public_task_data(task)
     return plan_dict
 
 
@@ -1067,14 +1191,13 @@ def _format_evaluation_feedback(evaluation: EvaluationResult) -> str:
 
 
 def _public_task_data(task: Dict[str, Any]) -> Dict[str, Any]:
-    cleaned = dict(task)
-    cadence_struct = cleaned.get("_cadence_struct")
-    if isinstance(cleaned.get("cadence"), dict):
-        cadence_struct = cadence_struct or cleaned.get("cadence")
+    """Strip internal keys and stringify cadence in place; safe to call more than once per task."""
+    cadence_struct = task.pop("_cadence_struct", None)
+    if isinstance(task.get("cadence"), dict):
+        cadence_struct = cadence_struct or task["cadence"]
     if isinstance(cadence_struct, dict):
-        cleaned["cadence"] = _stringify_cadence(cadence_struct)
-    cleaned.pop("_cadence_struct", None)
-    return cleaned
+        task["cadence"] = _stringify_cadence(cadence_struct)
+    return task
 
 
 def _stringify_cadence(struct: Dict[str, Any]) -> str:
@@ -1098,23 +1221,29 @@ def _stringify_cadence(struct: Dict[str, Any]) -> str:
     return cadence_type or "flex"
 
 
+# Shorthand cadence names mapped to their canonical (type, default count).
+_CADENCE_ALIASES: Dict[str, Tuple[str, int]] = {
+    "once_per_week": ("x_per_week", 1),
+    "weekly": ("x_per_week", 1),
+    "twice_per_week": ("x_per_week", 2),
+    "two_per_week": ("x_per_week", 2),
+    "2x_per_week": ("x_per_week", 2),
+    "2x_in_week": ("x_per_week", 2),
+    "thrice_per_week": ("x_per_week", 3),
+    "three_per_week": ("x_per_week", 3),
+    "3x_per_week": ("x_per_week", 3),
+    "3x_in_week": ("x_per_week", 3),
+}
+
+
 def _normalize_cadence_struct(struct: Dict[str, Any]) -> Dict[str, Any]:
     normalized = dict(struct)
     cadence_type = str(normalized.get("type") or normalized.get("cadence") or "").lower()
     count = _coerce_positive_int(normalized.get("count") or normalized.get("times_per_week"))
     days = normalized.get("days")
-    if cadence_type in {"once_per_week"}:
-        cadence_type = "x_per_week"
-        count = count or 1
-    elif cadence_type in {"twice_per_week", "two_per_week", "2x_per_week", "2x_in_week"}:
-        cadence_type = "x_per_week"
-        count = count or 2
-    elif cadence_type in {"thrice_per_week", "three_per_week", "3x_per_week", "3x_in_week"}:
-        cadence_type = "x_per_week"
-        count = count or 3
-    elif cadence_type in {"weekly"}:
-        cadence_type = "x_per_week"
-        count = count or 1
+    alias = _CADENCE_ALIASES.get(cadence_type)
+    if alias:
+        cadence_type, count = alias[0], count or alias[1]
     if not cadence_type:
         if count:
             cadence_type = "x_per_week"
@@ -1142,6 +1271,32 @@ def _coerce_positive_int(value: Any) -> Optional[int]:
         return None
 
 
+_FALLBACK_FOCUS_TEMPLATES = (
+    "Ground yourself and set a compassionate baseline.",
+    "Design tiny rituals that keep momentum alive.",
+    "Practice the core habit consistently with checkpoints.",
+    "Review progress and celebrate micro wins.",
+)
+_FALLBACK_SUCCESS_TEMPLATES = (
+    (
+        "Complete the environment setup so starting feels easy.",
+        "Log at least one gentle repetition to prove momentum.",
+    ),
+    (
+        "Show up for two short intentional sessions.",
+        "Capture one reflection about friction or ease.",
+    ),
+    (
+        "Hit the planned cadence without exceeding the effort band.",
+        "Note one lesson that will make Week 4 lighter.",
+    ),
+    (
+        "Review progress and archive wins in your journal.",
+        "Decide on one celebratory action or reset ritual.",
+    ),
+)
+
+
 def _fallback_plan(
     user_input: str,
     duration_weeks: int,
@@ -1156,37 +1311,11 @@ def _fallback_plan(
     title = user_input.strip() or "Sarthi AI Goal"
     weeks = max(4, min(12, duration_weeks or 8))
     specialty_key = _detect_specialty_key(user_input, resolution_type)
-    specialty_config = SPECIALTY_CONFIG.get(specialty_key, SPECIALTY_CONFIG["generic"])
-    task_templates = specialty_config.get("tasks") or SPECIALTY_CONFIG["generic"]["tasks"]
     goal_focus = _goal_focus_phrase(user_input)
     milestones: List[WeeklyMilestone] = []
-    focus_templates = [
-        "Ground yourself and set a compassionate baseline.",
-        "Design tiny rituals that keep momentum alive.",
-        "Practice the core habit consistently with checkpoints.",
-        "Review progress and celebrate micro wins.",
-    ]
-    success_templates = [
-        [
-            "Complete the environment setup so starting feels easy.",
-            "Log at least one gentle repetition to prove momentum.",
-        ],
-        [
-            "Show up for two short intentional sessions.",
-            "Capture one reflection about friction or ease.",
-        ],
-        [
-            "Hit the planned cadence without exceeding the effort band.",
-            "Note one lesson that will make Week 4 lighter.",
-        ],
-        [
-            "Review progress and archive wins in your journal.",
-            "Decide on one celebratory action or reset ritual.",
-        ],
-    ]
     for week in range(1, weeks + 1):
-        focus = focus_templates[min(week - 1, len(focus_templates) - 1)]
-        criteria = success_templates[min(week - 1, len(success_templates) - 1)]
+        focus = _FALLBACK_FOCUS_TEMPLATES[min(week - 1, len(_FALLBACK_FOCUS_TEMPLATES) - 1)]
+        criteria = _FALLBACK_SUCCESS_TEMPLATES[min(week - 1, len(_FALLBACK_SUCCESS_TEMPLATES) - 1)]
         milestones.append(
             WeeklyMilestone(
                 week_number=week,
@@ -1196,14 +1325,8 @@ def _fallback_plan(
         )
 
     week_tasks_raw = [
-        TaskDraft(
-            title=_format_template_text(template.get("title", "Week task"), goal_focus),
-            intent=_format_template_text(template.get("intent", "Focus intentionally."), goal_focus),
-            estimated_duration_min=int(template.get("duration") or _default_duration(resolution_type)),
-            cadence=template.get("cadence") or _default_cadence(resolution_type),
-            note=_format_template_text(template.get("note"), goal_focus),
-        )
-        for template in task_templates
+        TaskDraft(title=title, intent=intent, estimated_duration_min=duration, cadence=cadence, note=note)
+        for title, intent, duration, cadence, note in _rendered_fallback_tasks(specialty_key, goal_focus, resolution_type)
     ]
 
     enriched_tasks = _enrich_tasks_with_schedule(
@@ -1215,11 +1338,12 @@ def _fallback_plan(
     if len(enriched_tasks) > 4:
         enriched_tasks = enriched_tasks[:4]
 
+    week_one_drafts = [TaskDraft(**_public_task_data(task)) for task in enriched_tasks]
     week_sections = [
         PlanWeekSection(
             week=milestone.week_number,
             focus=milestone.focus_summary,
-            tasks=[TaskDraft(**_public_task_data(task)) for task in enriched_tasks] if milestone.week_number == 1 else [],
+            tasks=week_one_drafts if milestone.week_number == 1 else [],
         )
         for milestone in milestones
     ]
@@ -1229,7 +1353,7 @@ def _fallback_plan(
         why_this_matters="Sarthi AI reminder: name the emotional stake so motivation feels grounded.",
         duration_weeks=weeks,
         milestones=milestones,
-        week_1_tasks=[TaskDraft(**_public_task_data(task)) for task in enriched_tasks],
+        week_1_tasks=week_one_drafts,
         weeks=week_sections,
         band=band,
         band_rationale=band_rationale,
@@ -1248,15 +1372,21 @@ def _apply_availability_rules_to_plan(
         return plan_dict
     profile = sanitize_availability_profile(availability_profile)
     strict_mode = bool(profile.get("work_mode_enabled"))
-    plan_dict["week_1_tasks"] = [
+    original_week_one = plan_dict.get("week_1_tasks", []) or []
+    week_one = [
         _enforce_task_against_availability(task, resolution_domain, resolution_category, profile, strict_mode)
-        for task in plan_dict.get("week_1_tasks", []) or []
+        for task in original_week_one
     ]
+    plan_dict["week_1_tasks"] = week_one
     weeks = plan_dict.get("weeks")
     if isinstance(weeks, list):
         for section in weeks:
             tasks = section.get("tasks") if isinstance(section, dict) else None
-            if isinstance(tasks, list):
+            if tasks is original_week_one:
+                # _post_process_plan shares the week-one list with its section; keep it shared so
+                # the tasks are enforced (and later published) once.
+                section["tasks"] = week_one
+            elif isinstance(tasks, list):
                 section["tasks"] = [
                     _enforce_task_against_availability(task, resolution_domain, resolution_category, profile, strict_mode)
                     for task in tasks
@@ -1396,32 +1526,42 @@ def _format_template_text(value: Optional[str], goal_focus: str) -> Optional[str
         return value
 
 
+_ROUTINE_TYPES = frozenset({"habit", "skill", "learning"})
+_FITNESS_TYPES = frozenset({"health", "fitness"})
+_PROJECT_TYPES = frozenset({"project", "work"})
+
+
 def _default_duration(resolution_type: Optional[str]) -> int:
     normalized = (resolution_type or "").lower()
-    if normalized in {"habit", "skill", "learning"}:
+    if normalized in _ROUTINE_TYPES:
         return 30
-    if normalized in {"health", "fitness"}:
+    if normalized in _FITNESS_TYPES:
         return 25
-    if normalized in {"project", "work"}:
+    if normalized in _PROJECT_TYPES:
         return 45
     return 30
 
 
 def _default_cadence(resolution_type: Optional[str]) -> str:
     normalized = (resolution_type or "").lower()
-    if normalized in {"habit", "skill", "learning"}:
+    if normalized in _ROUTINE_TYPES:
         return "daily performance windows"
-    if normalized in {"health", "fitness"}:
+    if normalized in _FITNESS_TYPES:
         return "5x weekly mornings"
     return "3-4x weekly focus blocks"
 
 
+_SCHEDULING_HORIZON_DAYS = 28
+
+
 def _enrich_tasks_with_schedule(
     tasks: List[Dict[str, Any]],
     resolution_type: Optional[str],
     user_context: Optional[Dict[str, Any]],
     repeat_daily: bool = True,
 ) -> List[Dict[str, Any]]:
+    if not tasks:
+        return []
     today = date.today()
     week_start = today
     preferred_days = _normalize_days((user_context or {}).get("preferred_days"))
@@ -1430,9 +1570,12 @@ def _enrich_tasks_with_schedule(
     confidence = _confidence_level(preferred_days, preferred_blocks)
 
     time_pref = _preferred_time_for_resolution(resolution_type, preferred_blocks)
-    daily_load: Dict[date, List[int]] = {}
-    last_long_day: Optional[date] = None
-    daily_time_slots: Dict[date, set[str]] = {}
+    slot_candidates = _time_slot_candidates(_pick_time(time_pref, work_hours))
+    # Per-day state is indexed by offset from week_start; target days fall within the first week
+    # and _schedule_on_or_after looks at most 21 days ahead, so the horizon always covers them.
+    daily_load: List[List[int]] = [[] for _ in range(_SCHEDULING_HORIZON_DAYS)]
+    daily_time_slots: List[int] = [0] * _SCHEDULING_HORIZON_DAYS
+    last_long_idx: Optional[int] = None
 
     enriched: List[Dict[str, Any]] = []
     for original in tasks:
@@ -1443,20 +1586,21 @@ def _enrich_tasks_with_schedule(
         if not target_days:
             target_days = [week_start]
         for target_day in target_days:
-            candidate_day = _schedule_on_or_after(
-                target_day,
+            candidate_idx = _schedule_on_or_after(
+                (target_day - week_start).days,
+                week_start.weekday(),
                 preferred_days,
                 duration,
                 daily_load,
-                last_long_day,
+                last_long_idx,
             )
             if duration and duration > 60:
-                last_long_day = candidate_day
+                last_long_idx = candidate_idx
 
-            base_time = _pick_time(time_pref, work_hours)
-            used_times = daily_time_slots.setdefault(candidate_day, set())
-            suggested_time = _find_free_time_slot(base_time, used_times)
-            iso_day = candidate_day.isoformat() if candidate_day else None
+            suggested_time, daily_time_slots[candidate_idx] = _find_free_time_slot(
+                slot_candidates, daily_time_slots[candidate_idx]
+            )
+            iso_day = (week_start + timedelta(days=candidate_idx)).isoformat()
             clone = dict(base)
             clone["suggested_day"] = iso_day
             clone["suggested_time"] = suggested_time
@@ -1477,8 +1621,16 @@ def _build_cadence_struct(raw) -> Dict[str, Any]:
             struct["type"] = str(struct["type"]).lower()
         return _normalize_cadence_struct(struct)
     if isinstance(raw, str):
-        return _normalize_cadence_struct({"type": raw.lower(), "times": ["morning"]})
-    return _normalize_cadence_struct({"type": "flex", "times": ["morning"]})
+        cached = _cadence_from_string(raw.lower())
+    else:
+        cached = _cadence_from_string("flex")
+    # Callers attach the struct to each task, so hand out a copy rather than the cached dict.
+    return {**cached, "times": list(cached["times"])}
+
+
+@lru_cache(maxsize=128)
+def _cadence_from_string(cadence_type: str) -> Dict[str, Any]:
+    return _normalize_cadence_struct({"type": cadence_type, "times": ["morning"]})
 
 
 def _extract_duration(task: Dict[str, Any]) -> int:
@@ -1488,25 +1640,31 @@ def _extract_duration(task: Dict[str, Any]) -> int:
     return 30
 
 
+_WEEKDAY_INDEX = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+
+
 def _normalize_days(raw_days) -> List[int]:
     if not raw_days:
         return []
-    mapping = {
-        "monday": 0,
-        "tuesday": 1,
-        "wednesday": 2,
-        "thursday": 3,
-        "friday": 4,
-        "saturday": 5,
-        "sunday": 6,
-    }
-    normalized = []
-    for day in raw_days:
-        if isinstance(day, str):
-            key = day.strip().lower()
-            if key in mapping:
-                normalized.append(mapping[key])
-    return normalized
+    return list(_weekday_indexes(tuple(day for day in raw_days if isinstance(day, str))))
+
+
+@lru_cache(maxsize=256)
+def _weekday_indexes(days: Tuple[str, ...]) -> Tuple[int, ...]:
+    indexes = []
+    for day in days:
+        key = day.strip().lower()
+        if key in _WEEKDAY_INDEX:
+            indexes.append(_WEEKDAY_INDEX[key])
+    return tuple(indexes)
 
 
 def _confidence_level(preferred_days, preferred_blocks) -> str:
@@ -1517,21 +1675,25 @@ def _confidence_level(preferred_days, preferred_blocks) -> str:
     return "low"
 
 
+_BLOCK_TO_TIME = {
+    "morning": "07:30",
+    "afternoon": "13:00",
+    "evening": "19:00",
+    "night": "21:00",
+}
+_MORNING_TYPES = frozenset({"habit", "health", "fitness"})
+_EVENING_TYPES = frozenset({"skill", "learning", "project", "hobby"})
+
+
 def _preferred_time_for_resolution(resolution_type: Optional[str], user_blocks: List[str]) -> str:
-    block_map = {
-        "morning": "07:30",
-        "afternoon": "13:00",
-        "evening": "19:00",
-        "night": "21:00",
-    }
     if user_blocks:
         first = user_blocks[0].strip().lower()
-        return block_map.get(first, "09:00")
+        return _BLOCK_TO_TIME.get(first, "09:00")
 
     normalized = (resolution_type or "").lower()
-    if normalized in {"habit", "health", "fitness"}:
+    if normalized in _MORNING_TYPES:
         return "07:30"
-    if normalized in {"skill", "learning", "project", "hobby"}:
+    if normalized in _EVENING_TYPES:
         return "19:00"
     return "10:00"
 
@@ -1550,18 +1712,29 @@ def _pick_time(preferred_time: str, work_hours: Optional[str]) -> str:
     return preferred_time
 
 
-def _find_free_time_slot(base_time: str, used_times: set[str]) -> str:
-    """Avoid double-booking the same time slot by nudging in 30-minute increments."""
+_TIME_SLOT_OFFSETS = (0, 30, 60, 90, 120)
+_MINUTES_PER_DAY = 24 * 60
+
+
+def _time_slot_candidates(base_time: str) -> Tuple[int, ...]:
     base_minutes = _time_str_to_minutes(base_time)
-    for offset in range(5):
-        candidate = _minutes_to_time(base_minutes + offset * 30)
-        if candidate not in used_times:
-            used_times.add(candidate)
-            return candidate
-    used_times.add(base_time)
-    return base_time
+    return tuple((base_minutes + offset) % _MINUTES_PER_DAY for offset in _TIME_SLOT_OFFSETS)
+
+
+def _find_free_time_slot(slot_candidates: Tuple[int, ...], used_mask: int) -> Tuple[str, int]:
+    """Avoid double-booking the same time slot by nudging in 30-minute increments.
 
+    Booked start times are tracked as a bitmask with one bit per minute of the day; returns the
+    chosen ``HH:MM`` and the updated mask.
+    """
+    for minute in slot_candidates:
+        bit = 1 << minute
+        if not used_mask & bit:
+            return _minutes_to_time(minute), used_mask | bit
+    return _minutes_to_time(slot_candidates[0]), used_mask
 
+
+@lru_cache(maxsize=None)
 def _time_str_to_minutes(value: str) -> int:
     try:
         hours, minutes = [int(part) for part in value.split(":")]
@@ -1570,6 +1743,7 @@ def _time_str_to_minutes(value: str) -> int:
         return 8 * 60
 
 
+@lru_cache(maxsize=None)
 def _minutes_to_time(total_minutes: int) -> str:
     total_minutes %= 24 * 60
     hours = total_minutes // 60
@@ -1578,26 +1752,24 @@ def _minutes_to_time(total_minutes: int) -> str:
 
 
 def _schedule_on_or_after(
-    target_day: date,
+    target_idx: int,
+    start_weekday: int,
     preferred_days: List[int],
     duration: int,
-    daily_load: Dict[date, List[int]],
-    last_long_day: Optional[date],
-) -> date:
-    day = target_day
-    max_checks = 21
-    for _ in range(max_checks):
-        weekday = day.weekday()
-        matches_preference = not preferred_days or weekday in preferred_days
-        load = daily_load.setdefault(day, [])
+    daily_load: List[List[int]],
+    last_long_idx: Optional[int],
+) -> int:
+    """Return the first day index from ``target_idx`` that fits preferences and load limits."""
+    for idx in range(target_idx, min(target_idx + 21, len(daily_load))):
+        matches_preference = not preferred_days or (start_weekday + idx) % 7 in preferred_days
+        load = daily_load[idx]
         effective_load = len([d for d in load if d >= 15])
-        long_conflict = duration > 60 and last_long_day and (day - last_long_day).days <= 1
+        long_conflict = duration > 60 and last_long_idx is not None and idx - last_long_idx <= 1
         if matches_preference and effective_load < 2 and not long_conflict:
             load.append(duration)
-            return day
-        day += timedelta(days=1)
-    daily_load.setdefault(target_day, []).append(duration)
-    return target_day
+            return idx
+    daily_load[target_idx].append(duration)
+    return target_idx
 
 
 def _expand_target_days(
@@ -1607,70 +1779,77 @@ def _expand_target_days(
     first_day_hint: Optional[str],
 ) -> List[date]:
     cadence_type = str(cadence_struct.get("type") or cadence_struct.get("cadence") or "").lower()
-    days: List[date] = []
-    hint_date = _parse_iso_date(first_day_hint) if first_day_hint else None
-    if cadence_type == "daily" or (repeat_daily and "daily" in cadence_type):
-        days = [week_start + timedelta(days=i) for i in range(7)]
-    elif cadence_type == "specific_days":
-        raw_days = cadence_struct.get("days") or []
-        normalized = _normalize_days(raw_days)
-        for idx in normalized:
-            offset = (idx - week_start.weekday()) % 7
-            days.append(week_start + timedelta(days=offset))
-    elif cadence_type in {"x_per_week", "times_per_week"}:
-        count = int(cadence_struct.get("count") or cadence_struct.get("times_per_week") or 1)
-        days.extend(_evenly_spaced_days(count, week_start))
+    if repeat_daily and "daily" in cadence_type:
+        handler = _CADENCE_HANDLERS["daily"]
+    else:
+        handler = _CADENCE_HANDLERS.get(cadence_type)
+    if handler is not None:
+        days = handler(cadence_struct, week_start)
     elif cadence_type.endswith("x_per_week"):
-        try:
-            count = int(cadence_type.split("x")[0])
-        except Exception:
-            count = 1
-        days.extend(_evenly_spaced_days(count, week_start))
-    elif cadence_type in {"2x_in_week", "3x_in_week"}:
-        try:
-            count = int(cadence_type.split("x")[0])
-        except Exception:
-            count = 1
-        days.extend(_evenly_spaced_days(count, week_start))
-    elif cadence_type in {"once", "one_time"}:
-        days = [week_start]
-    elif cadence_type in {"twice", "twice_per_week", "two_per_week"}:
-        days.extend(_evenly_spaced_days(2, week_start))
-    elif cadence_type in {"thrice", "thrice_per_week", "three_per_week"}:
-        days.extend(_evenly_spaced_days(3, week_start))
-    elif cadence_type in {"once_per_week", "one_time", "once"}:
-        days = [week_start]
-    elif cadence_type in {"twice_per_week", "two_per_week"}:
-        days.extend(_evenly_spaced_days(2, week_start))
-    elif cadence_type in {"thrice_per_week", "three_per_week"}:
-        days.extend(_evenly_spaced_days(3, week_start))
-    elif cadence_type == "once":
-        days = [week_start]
+        prefix = cadence_type.split("x")[0]
+        days = _evenly_spaced_days(int(prefix) if prefix.isdigit() else 1, week_start)
     else:
         days = [week_start]
-    return sorted({day for day in days if day})
+    # Every handler yields sorted, de-duplicated days, so no re-sorting is needed here.
+    return list(days)
 
 
-def _evenly_spaced_days(count: int, week_start: date) -> List[date]:
+def _daily_days(cadence_struct: Dict[str, Any], week_start: date) -> List[date]:
+    return [week_start + timedelta(days=i) for i in range(7)]
+
+
+def _specific_days(cadence_struct: Dict[str, Any], week_start: date) -> List[date]:
+    start_weekday = week_start.weekday()
+    offsets = sorted({(idx - start_weekday) % 7 for idx in _normalize_days(cadence_struct.get("days") or [])})
+    return [week_start + timedelta(days=offset) for offset in offsets]
+
+
+def _counted_days(cadence_struct: Dict[str, Any], week_start: date) -> Sequence[date]:
+    count = int(cadence_struct.get("count") or cadence_struct.get("times_per_week") or 1)
+    return _evenly_spaced_days(count, week_start)
+
+
+def _fixed_count_handler(count: int) -> Callable[[Dict[str, Any], date], Sequence[date]]:
+    return lambda cadence_struct, week_start: _evenly_spaced_days(count, week_start)
+
+
+def _single_day(cadence_struct: Dict[str, Any], week_start: date) -> List[date]:
+    return [week_start]
+
+
+_CADENCE_HANDLERS: Dict[str, Callable[[Dict[str, Any], date], Sequence[date]]] = {
+    "daily": _daily_days,
+    "specific_days": _specific_days,
+    "x_per_week": _counted_days,
+    "times_per_week": _counted_days,
+    "once": _single_day,
+    "one_time": _single_day,
+    "once_per_week": _single_day,
+    "twice": _fixed_count_handler(2),
+    "twice_per_week": _fixed_count_handler(2),
+    "two_per_week": _fixed_count_handler(2),
+    "thrice": _fixed_count_handler(3),
+    "thrice_per_week": _fixed_count_handler(3),
+    "three_per_week": _fixed_count_handler(3),
+    "2x_in_week": _fixed_count_handler(2),
+    "3x_in_week": _fixed_count_handler(3),
+    **{f"{count}x_per_week": _fixed_count_handler(count) for count in range(1, 8)},
+}
+
+
+@lru_cache(maxsize=256)
+def _evenly_spaced_days(count: int, week_start: date) -> Tuple[date, ...]:
     if count <= 1:
-        return [week_start]
+        return (week_start,)
     count = max(1, min(count, 7))
     spacing = 7 / count
-    days = []
-    for i in range(count):
-        offset = min(6, int(round(i * spacing)))
-        days.append(week_start + timedelta(days=offset))
-    return days
+    return tuple(week_start + timedelta(days=min(6, int(round(i * spacing)))) for i in range(count))
 
 
 def _parse_iso_date(value: Optional[str]) -> Optional[date]:
-    if not value:
+    if not value or not isinstance(value, str):
         return None
     try:
-        parts = value.split("T")[0].split("-")
-        if len(parts) != 3:
-            return None
-        year, month, day = map(int, parts)
-        return date(year, month, day)
-    except Exception:
+        return date.fromisoformat(value[:10])
+    except ValueError:
         return None
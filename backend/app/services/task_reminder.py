@@ -1,16 +1,16 @@
 """Task reminder notification service."""
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import logging
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta, timezone, time as dt_time
+from datetime import datetime, timedelta, timezone
 from typing import Iterable, List, Tuple
 
 import httpx
 import openai
-from zoneinfo import ZoneInfo
 
 from sqlalchemy.orm import Session
 
@@ -20,10 +20,14 @@ from app.db.models.task import Task
 from app.db.models.user_preferences import UserPreferences
 from app.observability.metrics import log_metric
 from app.observability.tracing import trace
-from app.services.notification_tokens import fetch_user_tokens
+from app.services.notification_tokens import fetch_tokens_for_users
+from app.services.openai_clients import build_async_openai_client
 
 _REMINDER_KEY = "reminder_sent_at"
-_tz = ZoneInfo(settings.scheduler_timezone)
+# Expo accepts at most 100 messages per push request.
+_EXPO_MAX_MESSAGES = 100
+# Upper bound on in-flight LLM calls while composing one run's reminders.
+_MESSAGE_CONCURRENCY = 8
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +35,14 @@ logger = logging.getLogger(__name__)
 class ReminderCandidate:
     task: Task
     scheduled_at: datetime
+    # Copy of task.metadata_json, safe to mutate before writing back.
+    metadata: dict
+
+
+@dataclass
+class QueuedReminder:
+    candidate: ReminderCandidate
+    payloads: list[dict]
 
 
 @dataclass
@@ -52,22 +64,24 @@ def run_task_reminder_check(db: Session) -> ReminderRunStats:
         logger.debug("Task reminder job found no upcoming tasks in window.")
         return ReminderRunStats(users_processed=0, snapshots_written=0)
 
-    users_notified: set[str] = set()
-    notifications_sent = 0
-
-    for candidate in candidates:
-        task = candidate.task
-        metadata = dict(task.metadata_json or {})
-        if metadata.get(_REMINDER_KEY):
-            continue
-        tokens = fetch_user_tokens(db, task.user_id)
-        if not tokens:
-            continue
-
-        message = _generate_message(db, task, candidate.scheduled_at)
+    user_ids = list({candidate.task.user_id for candidate in candidates})
+    tokens_by_user = fetch_tokens_for_users(db, user_ids)
+    prefs_by_user = _load_preferences_by_user(db, user_ids)
+    goals_by_user = _load_goal_contexts(db, user_ids)
+
+    eligible = [
+        candidate
+        for candidate in candidates
+        if tokens_by_user.get(candidate.task.user_id)
+        and _preferences_allow_reminder(prefs_by_user.get(candidate.task.user_id))
+    ]
+    messages = _generate_messages(eligible, goals_by_user)
+
+    queued: List[QueuedReminder] = []
+    for candidate, message in zip(eligible, messages):
         if not message:
             continue
-
+        tokens = tokens_by_user[candidate.task.user_id]
         payloads = [
             {
                 "to": token.token,
@@ -78,31 +92,30 @@ def run_task_reminder_check(db: Session) -> ReminderRunStats:
             for token in tokens
             if token.active
         ]
-        if not payloads:
-            continue
+        if payloads:
+            queued.append(QueuedReminder(candidate=candidate, payloads=payloads))
 
-        if not _preferences_allow_reminder(db, task.user_id):
-            continue
-
-        with trace(
-            "notifications.task_reminder",
-            metadata={"user_id": str(task.user_id), "task_id": str(task.id)},
-            user_id=str(task.user_id),
-        ):
-            _dispatch(payloads)
-            metadata[_REMINDER_KEY] = now.isoformat()
-            task.metadata_json = metadata
-            db.add(task)
-            db.commit()
-            users_notified.add(str(task.user_id))
-            notifications_sent += len(payloads)
-            logger.info(
-                "Task reminder sent user=%s task=%s tokens=%s scheduled_at=%s",
-                task.user_id,
-                task.id,
-                len(payloads),
-                candidate.scheduled_at.isoformat(),
-            )
+    delivered = _send_reminders(queued)
+    sent_at = now.isoformat()
+    users_notified: set[str] = set()
+    notifications_sent = 0
+    for reminder in delivered:
+        task = reminder.candidate.task
+        metadata = reminder.candidate.metadata
+        metadata[_REMINDER_KEY] = sent_at
+        task.metadata_json = metadata
+        users_notified.add(str(task.user_id))
+        notifications_sent += len(reminder.payloads)
+        logger.info(
+            "Task reminder sent user=%s task=%s tokens=%s scheduled_at=%s",
+            task.user_id,
+            task.id,
+            len(reminder.payloads),
+            reminder.candidate.scheduled_at.isoformat(),
+        )
+    if delivered:
+        db.add_all([reminder.candidate.task for reminder in delivered])
+        db.commit()
 
     if notifications_sent:
         log_metric("task_reminders.sent", notifications_sent, metadata={})
@@ -112,47 +125,64 @@ def run_task_reminder_check(db: Session) -> ReminderRunStats:
 
 
 def _gather_candidates(db: Session, window_start: datetime, window_end: datetime) -> List[ReminderCandidate]:
-    start_day = window_start.date()
-    end_day = window_end.date()
     rows: List[Task] = (
         db.query(Task)
         .filter(
-            Task.scheduled_day.isnot(None),
-            Task.scheduled_time.isnot(None),
+            Task.scheduled_at_utc.between(window_start, window_end),
             Task.completed.is_(False),
-            Task.scheduled_day >= min(start_day, end_day),
-            Task.scheduled_day <= max(start_day, end_day),
         )
         .all()
     )
     candidates: List[ReminderCandidate] = []
     for task in rows:
         metadata = dict(task.metadata_json or {})
-        if metadata.get("draft"):
-            continue
-        scheduled_at = _combine_datetime(task.scheduled_day, task.scheduled_time)
-        if not scheduled_at:
+        if metadata.get("draft") or metadata.get(_REMINDER_KEY):
             continue
-        if window_start <= scheduled_at <= window_end:
-            if metadata.get(_REMINDER_KEY):
-                continue
-            candidates.append(ReminderCandidate(task=task, scheduled_at=scheduled_at))
+        scheduled_at = task.scheduled_at_utc
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+        candidates.append(ReminderCandidate(task=task, scheduled_at=scheduled_at, metadata=metadata))
     return candidates
 
 
-def _combine_datetime(day: date | None, scheduled_time: dt_time | None) -> datetime | None:
-    if not day or not scheduled_time:
-        return None
-    local_dt = datetime.combine(day, scheduled_time)
-    if scheduled_time.tzinfo:
-        aware = local_dt.astimezone(timezone.utc)
-    else:
-        aware = local_dt.replace(tzinfo=_tz).astimezone(timezone.utc)
-    return aware
+def _generate_messages(candidates: List[ReminderCandidate], goals_by_user: dict) -> List[str]:
+    """Compose reminder copy for every candidate, fanning LLM calls out concurrently."""
+    if not candidates:
+        return []
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return [
+            _fallback_message(candidate.task.title, goals_by_user.get(candidate.task.user_id, []))
+            for candidate in candidates
+        ]
+    return asyncio.run(_generate_messages_async(api_key, candidates, goals_by_user))
+
+
+async def _generate_messages_async(api_key: str, candidates: List[ReminderCandidate], goals_by_user: dict) -> List[str]:
+    # The async client's connection pool is bound to this run's event loop, so it is scoped to the run.
+    semaphore = asyncio.Semaphore(_MESSAGE_CONCURRENCY)
+    async with build_async_openai_client(api_key) as client:
+        return await asyncio.gather(
+            *(
+                _generate_message(
+                    client,
+                    semaphore,
+                    candidate.task,
+                    candidate.scheduled_at,
+                    goals_by_user.get(candidate.task.user_id, []),
+                )
+                for candidate in candidates
+            )
+        )
 
 
-def _generate_message(db: Session, task: Task, scheduled_at: datetime) -> str:
-    goals = _load_goal_context(db, task.user_id)
+async def _generate_message(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    task: Task,
+    scheduled_at: datetime,
+    goals: list[str],
+) -> str:
     base_prompt = (
         "You are Sarathi AI, a compassionate accountability partner. "
         "Compose a short, inspiring reminder (max 30 words) that nudges the user to complete their task. "
@@ -162,20 +192,16 @@ def _generate_message(db: Session, task: Task, scheduled_at: datetime) -> str:
     if goals:
         task_context += f"\nTop Goals: {', '.join(goals)}"
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        return _fallback_message(task.title, goals)
-
-    client = openai.OpenAI(api_key=api_key)
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            messages=[
-                {"role": "system", "content": base_prompt},
-                {"role": "user", "content": task_context},
-            ],
-        )
+        async with semaphore:
+            completion = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                temperature=0.7,
+                messages=[
+                    {"role": "system", "content": base_prompt},
+                    {"role": "user", "content": task_context},
+                ],
+            )
         content = completion.choices[0].message.content if completion.choices else None
         if content:
             return content.strip()
@@ -190,29 +216,76 @@ def _fallback_message(task_title: str, goals: list[str]) -> str:
     return f"Quick nudge: it's time for “{task_title}”. You've got this."
 
 
-def _load_goal_context(db: Session, user_id) -> list[str]:
+def _load_goal_contexts(db: Session, user_ids: List) -> dict:
+    """Return up to three active goal titles per user, most recently updated first."""
+    goals: dict = {}
+    if not user_ids:
+        return goals
     rows = (
-        db.query(Resolution)
-        .filter(Resolution.user_id == user_id, Resolution.status == "active")
-        .order_by(Resolution.updated_at.desc())
-        .limit(3)
+        db.query(Resolution.user_id, Resolution.title)
+        .filter(Resolution.user_id.in_(user_ids), Resolution.status == "active")
+        .order_by(Resolution.user_id, Resolution.updated_at.desc())
         .all()
     )
-    return [row.title for row in rows]
-
-
-def _dispatch(payloads: list[dict]) -> None:
+    for user_id, title in rows:
+        titles = goals.setdefault(user_id, [])
+        if len(titles) < 3:
+            titles.append(title)
+    return goals
+
+
+def _send_reminders(queued: List[QueuedReminder]) -> List[QueuedReminder]:
+    """Push queued reminders over one connection in Expo-sized batches; return the delivered ones."""
+    if not queued:
+        return []
+    delivered: List[QueuedReminder] = []
+    with httpx.Client(timeout=5) as client:
+        for batch in _batch_by_message_count(queued, _EXPO_MAX_MESSAGES):
+            payloads = [payload for reminder in batch for payload in reminder.payloads]
+            with trace(
+                "notifications.task_reminder",
+                metadata={"tasks": len(batch), "messages": len(payloads)},
+            ):
+                try:
+                    _dispatch(client, payloads)
+                except Exception:
+                    logger.exception("Task reminder batch failed tasks=%s messages=%s", len(batch), len(payloads))
+                    continue
+            delivered.extend(batch)
+    return delivered
+
+
+def _batch_by_message_count(queued: List[QueuedReminder], limit: int) -> Iterable[List[QueuedReminder]]:
+    # A task's payloads always travel together so delivery can be tracked per task.
+    batch: List[QueuedReminder] = []
+    size = 0
+    for reminder in queued:
+        if batch and size + len(reminder.payloads) > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(reminder)
+        size += len(reminder.payloads)
+    if batch:
+        yield batch
+
+
+def _dispatch(client: httpx.Client, payloads: list[dict]) -> None:
     if not payloads:
         return
     headers = {"accept": "application/json", "content-type": "application/json"}
-    with httpx.Client(timeout=5) as client:
-        response = client.post(settings.expo_push_url, json=payloads, headers=headers)
-        if response.status_code >= 400:
-            raise RuntimeError(f"Failed to send push notification: {response.text}")
+    response = client.post(settings.expo_push_url, json=payloads, headers=headers)
+    if response.status_code >= 400:
+        raise RuntimeError(f"Failed to send push notification: {response.text}")
+
+
+def _load_preferences_by_user(db: Session, user_ids: List) -> dict:
+    if not user_ids:
+        return {}
+    rows = db.query(UserPreferences).filter(UserPreferences.user_id.in_(user_ids)).all()
+    return {row.user_id: row for row in rows}
 
 
-def _preferences_allow_reminder(db: Session, user_id) -> bool:
-    prefs = db.get(UserPreferences, user_id)
+def _preferences_allow_reminder(prefs: UserPreferences | None) -> bool:
     if not prefs:
         return True
     if prefs.coaching_paused:
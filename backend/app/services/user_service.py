@@ -3,7 +3,9 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.db.models.user import User
@@ -11,27 +13,31 @@ from app.services.availability_profile import DEFAULT_AVAILABILITY_PROFILE, DEFA
 
 
 def get_or_create_user(db: Session, user_id: UUID) -> User:
-    """Fetch an existing user or create a new row safely."""
+    """Fetch an existing user or create the row with a conflict-safe upsert."""
     user = db.get(User, user_id)
-    default_profile = {
+    if user is None:
+        insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+        stmt = (
+            insert(User)
+            .values(id=user_id, availability_profile=_default_profile())
+            .on_conflict_do_nothing(index_elements=[User.id])
+            .returning(User)
+        )
+        user = db.scalars(stmt).one_or_none()
+        if user is None:
+            # Another request inserted the row first; load the winner.
+            user = db.get(User, user_id)
+    elif user.availability_profile is None:
+        db.execute(
+            update(User)
+            .where(User.id == user_id, User.availability_profile.is_(None))
+            .values(availability_profile=_default_profile())
+        )
+    return user
+
+
+def _default_profile() -> dict:
+    return {
         **DEFAULT_AVAILABILITY_PROFILE,
         "personal_slots": dict(DEFAULT_PERSONAL_SLOTS),
     }
-    if user:
-        if getattr(user, "availability_profile", None) is None:
-            user.availability_profile = default_profile
-            db.add(user)
-            db.flush()
-        return user
-
-    user = User(id=user_id, availability_profile=default_profile)
-    db.add(user)
-    try:
-        db.flush()
-        return user
-    except IntegrityError:
-        db.rollback()
-        existing = db.get(User, user_id)
-        if existing:
-            return existing
-        raise
@@ -1,22 +1,75 @@
 """LLM-driven weekly planner (Rolling Wave) service."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import logging
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import date, timedelta, time
-from typing import Dict, List, Set, Tuple
-from uuid import UUID
+from datetime import date, datetime, timedelta, time, timezone
+from functools import lru_cache
+from time import monotonic
+from typing import Dict, Iterable, List, Set, Tuple
+from uuid import UUID, uuid4
 
 import openai
+from sqlalchemy import Text, and_, case, cast, func, insert, or_
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.api.schemas.weekly_plan import MicroResolutionPayload, ResolutionWeeklyStat, SuggestedTaskPayload, WeeklyPlanInputs
+from app.core.config import settings
 from app.db.models.agent_action_log import AgentActionLog
 from app.db.models.user import User
 from app.db.models.resolution import Resolution
-from app.db.models.task import Task
+from app.db.models.task import Task, localize_scheduled_time, scheduled_at_utc_for
+from app.db.types import json_field_text
 from app.services.availability_profile import availability_prompt_block, sanitize_availability_profile
+from app.services.openai_clients import build_async_openai_client, build_openai_client
+
+logger = logging.getLogger(__name__)
+
+_PLAN_COMPLETION_OPTIONS = {
+    "model": "gpt-4o",
+    "response_format": {"type": "json_object"},
+    "temperature": 0.6,
+}
+# Validated plan JSON keyed by a hash of the full prompt; users with identical context share a plan.
+# The prompt carries no date, so entries expire after a day to keep identical contexts from getting
+# the same plan week after week in the long-lived worker.
+_PLAN_CACHE_SIZE = 1024
+_PLAN_CACHE_TTL_SECONDS = 24 * 60 * 60
+_plan_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+# Validated once; hand out copies via _fallback_tasks() so no plan can mutate the shared templates.
+_FALLBACK_TASKS: Tuple[SuggestedTaskPayload, ...] = (
+    SuggestedTaskPayload(title="Schedule three 30-min focus blocks", duration_min=30, suggested_time="morning"),
+    SuggestedTaskPayload(title="One midweek reflection note", duration_min=10, suggested_time="evening"),
+    SuggestedTaskPayload(title="Weekend reset + planning ritual", duration_min=25, suggested_time="afternoon"),
+)
+_PLAN_SYSTEM_PROMPT = (
+    "You are Sarthi AI, a strategic coach. Review the user's last week and design the next. "
+    "If they struggled (<50%), simplify and focus on consistency. "
+    "If they crushed it (>80%), gently increase intensity or variety."
+)
+_PLAN_USER_PROMPT = (
+    "Context: {context}\n"
+    "Resolution stats JSON: {stats}\n"
+    "Availability guidance: {availability}\n"
+    "Focus on the lowest-performing resolution unless all are above 80% completion.\n"
+    "Generate a 'Micro-Resolution' JSON object with keys 'title', 'why_this', "
+    "and 'suggested_week_1_tasks'. Include 3-5 specific tasks for the upcoming week. "
+    "Each task must contain 'title', 'duration_min' (integer minutes), "
+    "and 'suggested_time' (morning, afternoon, or evening)."
+)
+_SUGGESTED_TIMES: Dict[str, time] = {
+    "morning": time(hour=9, minute=0),
+    "afternoon": time(hour=13, minute=0),
+    "evening": time(hour=19, minute=0),
+}
 
 
 @dataclass
@@ -32,10 +85,22 @@ class SnapshotResult:
     created: bool
 
 
+@dataclass
+class WeeklyPlanContext:
+    """Planner inputs gathered from the database before the LLM call."""
+
+    inputs: WeeklyPlanInputs
+    context_summary: str
+    resolution_stats: List[ResolutionWeeklyStat]
+    focus_resolution: Dict[str, object] | None
+    availability_profile: Dict[str, object]
+
+
 def get_weekly_plan_preview(db: Session, user_id: UUID) -> WeeklyPlanPreview:
     """Return a preview of the upcoming week using the LLM-driven planner."""
-    week_start, week_end = _upcoming_week_window()
-    micro_resolution, inputs = generate_weekly_plan(db, user_id)
+    today = date.today()
+    week_start, week_end = _upcoming_week_window(today)
+    micro_resolution, inputs = generate_weekly_plan(db, user_id, base_date=today)
     return WeeklyPlanPreview(
         week=(week_start, week_end),
         inputs=inputs,
@@ -57,9 +122,7 @@ def persist_weekly_plan_preview(
     The preview argument is ignored because run_weekly_planning_for_user now regenerates the plan
     when persisting to keep the snapshot + generated tasks in sync.
     """
-    log = run_weekly_planning_for_user(db, user_id=user_id, force=force, request_id=request_id)
-    created = bool(getattr(log, "_rolling_wave_created", True))
-    return SnapshotResult(log=log, created=created)
+    return run_weekly_planning_for_user(db, user_id=user_id, force=force, request_id=request_id)
 
 
 def load_latest_weekly_plan(db: Session, user_id: UUID) -> AgentActionLog | None:
@@ -75,40 +138,27 @@ def load_latest_weekly_plan(db: Session, user_id: UUID) -> AgentActionLog | None
     )
 
 
-def generate_weekly_plan(db: Session, user_id: UUID) -> Tuple[MicroResolutionPayload, WeeklyPlanInputs]:
+def generate_weekly_plan(
+    db: Session,
+    user_id: UUID,
+    *,
+    base_date: date | None = None,
+) -> Tuple[MicroResolutionPayload, WeeklyPlanInputs]:
     """
     Call the Rolling Wave planner to produce a micro-resolution and suggested tasks.
 
     Returns both the micro plan and the contextual WeeklyPlanInputs used by response payloads.
     """
-    user = db.get(User, user_id)
-    if not user:
-        raise ValueError("User not found")
-
-    availability_profile = sanitize_availability_profile(getattr(user, "availability_profile", None))
-    stats = _collect_weekly_stats(db, user_id)
-    focus_resolution = _pick_focus_resolution(stats["resolution_stats"])
-    context_summary = _gather_user_context(stats, focus_resolution, availability_profile)
-    resolution_models = [
-        ResolutionWeeklyStat(**entry)
-        for entry in stats["resolution_stats"]
-    ]
+    plan_context = _build_plan_context(db, user_id, base_date=base_date)
+    if not _needs_llm(plan_context):
+        return _fallback_micro_resolution(_focus_title(plan_context)), plan_context.inputs
     micro_resolution = _request_plan_from_llm(
-        context_summary,
-        resolution_models,
-        focus_resolution,
-        availability_profile,
+        plan_context.context_summary,
+        plan_context.resolution_stats,
+        plan_context.focus_resolution,
+        plan_context.availability_profile,
     )
-
-    inputs = WeeklyPlanInputs(
-        active_resolutions=stats["active_resolutions"],
-        active_tasks_total=stats["total_tasks"],
-        active_tasks_completed=stats["completed_tasks"],
-        completion_rate=stats["completion_rate"],
-        resolution_stats=resolution_models,
-        primary_focus_resolution_id=focus_resolution["resolution_id"] if focus_resolution else None,
-    )
-    return micro_resolution, inputs
+    return micro_resolution, plan_context.inputs
 
 
 def run_weekly_planning_for_user(
@@ -117,17 +167,20 @@ def run_weekly_planning_for_user(
     *,
     force: bool = False,
     request_id: str | None = None,
-) -> AgentActionLog:
+    base_date: date | None = None,
+) -> SnapshotResult:
     """
     Execute the Rolling Wave planner, persist the snapshot, and create active tasks.
 
-    Deduplicates by week unless force=True. Returns the AgentActionLog that was reused/created.
+    Deduplicates by week unless force=True. Returns the reused/created AgentActionLog and whether it is new.
+    base_date (default: today) anchors both the trailing stats window and the upcoming week.
     """
     user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
 
-    week_start, week_end = _upcoming_week_window()
+    today = base_date or date.today()
+    week_start, week_end = _upcoming_week_window(today)
     week_start_iso = week_start.isoformat()
     week_end_iso = week_end.isoformat()
 
@@ -140,11 +193,80 @@ def run_weekly_planning_for_user(
             week_end=week_end_iso,
         )
         if existing:
-            setattr(existing, "_rolling_wave_created", False)
-            return existing
+            return SnapshotResult(log=existing, created=False)
+
+    micro_resolution, inputs = generate_weekly_plan(db, user_id, base_date=today)
+    log = _store_weekly_plan(db, user_id, micro_resolution, inputs, week_start, request_id)
+    return SnapshotResult(log=log, created=True)
+
+
+def run_weekly_planning_for_users(
+    db: Session,
+    user_ids: Iterable[UUID],
+    *,
+    force: bool = False,
+    request_id: str | None = None,
+    base_date: date | None = None,
+) -> Dict[UUID, SnapshotResult]:
+    """
+    Batch variant of run_weekly_planning_for_user that overlaps the per-user LLM calls.
 
-    micro_resolution, inputs = generate_weekly_plan(db, user_id)
-    created_tasks = _materialize_tasks_from_plan(db, user_id, micro_resolution, week_start)
+    Database work stays on the calling thread: contexts are gathered first, the planner requests run
+    concurrently, then snapshots and tasks are written user by user. Users that fail are logged and
+    left out of the returned mapping.
+    """
+    today = base_date or date.today()
+    week_start, week_end = _upcoming_week_window(today)
+    week_start_iso = week_start.isoformat()
+    week_end_iso = week_end.isoformat()
+
+    results: Dict[UUID, SnapshotResult] = {}
+    to_plan: List[UUID] = []
+    for user_id in user_ids:
+        if not force:
+            existing = _find_existing_snapshot(
+                db,
+                user_id=user_id,
+                action_type="weekly_plan_generated",
+                week_start=week_start_iso,
+                week_end=week_end_iso,
+            )
+            if existing:
+                results[user_id] = SnapshotResult(log=existing, created=False)
+                continue
+        to_plan.append(user_id)
+
+    stats_by_user = _collect_weekly_stats_bulk(db, to_plan, today)
+    pending: List[Tuple[UUID, WeeklyPlanContext]] = []
+    for user_id in to_plan:
+        try:
+            pending.append((user_id, _build_plan_context(db, user_id, stats_by_user[user_id])))
+        except Exception:
+            logger.exception("Weekly plan context failed for user %s", user_id)
+
+    micro_resolutions = _request_plans_concurrently([plan_context for _, plan_context in pending])
+    for (user_id, plan_context), micro_resolution in zip(pending, micro_resolutions):
+        try:
+            log = _store_weekly_plan(db, user_id, micro_resolution, plan_context.inputs, week_start, request_id)
+            results[user_id] = SnapshotResult(log=log, created=True)
+        except Exception:
+            db.rollback()
+            logger.exception("Weekly plan persistence failed for user %s", user_id)
+    return results
+
+
+def _store_weekly_plan(
+    db: Session,
+    user_id: UUID,
+    micro_resolution: MicroResolutionPayload,
+    inputs: WeeklyPlanInputs,
+    week_start: date,
+    request_id: str | None,
+) -> AgentActionLog:
+    """Create the plan's tasks and snapshot log, then commit."""
+    week_start_iso = week_start.isoformat()
+    week_end_iso = (week_start + timedelta(days=6)).isoformat()
+    created_task_ids = _materialize_tasks_from_plan(db, user_id, micro_resolution, week_start)
 
     payload = {
         "user_id": str(user_id),
@@ -156,21 +278,22 @@ def run_weekly_planning_for_user(
         },
         "inputs": inputs.model_dump(mode="json"),
         "micro_resolution": micro_resolution.model_dump(),
-        "created_task_ids": [str(task.id) for task in created_tasks],
+        "created_task_ids": [str(task_id) for task_id in created_task_ids],
         "request_id": request_id or "",
     }
 
+    # id and created_at are set client-side so no refresh SELECT is needed after the commit.
     log = AgentActionLog(
+        id=uuid4(),
         user_id=user_id,
         action_type="weekly_plan_generated",
         action_payload=payload,
         reason="Rolling Wave weekly plan generated",
         undo_available=True,
+        created_at=datetime.now(timezone.utc),
     )
     db.add(log)
     db.commit()
-    db.refresh(log)
-    setattr(log, "_rolling_wave_created", True)
     return log
 
 
@@ -178,6 +301,43 @@ def run_weekly_planning_for_user(
 # Internal helpers
 # ---------------------------------------------------------------------------
 
+def _build_plan_context(
+    db: Session,
+    user_id: UUID,
+    stats: Dict[str, float | int | List[str] | List[Dict[str, object]]] | None = None,
+    *,
+    base_date: date | None = None,
+) -> WeeklyPlanContext:
+    user = db.get(User, user_id)
+    if not user:
+        raise ValueError("User not found")
+
+    availability_profile = sanitize_availability_profile(getattr(user, "availability_profile", None))
+    if stats is None:
+        stats = _collect_weekly_stats(db, user_id, base_date)
+    focus_resolution = _pick_focus_resolution(stats["resolution_stats"])
+    context_summary = _gather_user_context(stats, focus_resolution, availability_profile)
+    resolution_models = [
+        ResolutionWeeklyStat(**entry)
+        for entry in stats["resolution_stats"]
+    ]
+    inputs = WeeklyPlanInputs(
+        active_resolutions=stats["active_resolutions"],
+        active_tasks_total=stats["total_tasks"],
+        active_tasks_completed=stats["completed_tasks"],
+        completion_rate=stats["completion_rate"],
+        resolution_stats=resolution_models,
+        primary_focus_resolution_id=focus_resolution["resolution_id"] if focus_resolution else None,
+    )
+    return WeeklyPlanContext(
+        inputs=inputs,
+        context_summary=context_summary,
+        resolution_stats=resolution_models,
+        focus_resolution=focus_resolution,
+        availability_profile=availability_profile,
+    )
+
+
 def _gather_user_context(
     stats: Dict[str, float | int | List[str] | List[Dict[str, object]]],
     focus_resolution: Dict[str, object] | None,
@@ -219,58 +379,91 @@ def _gather_user_context(
     return context
 
 
-def _collect_weekly_stats(db: Session, user_id: UUID) -> Dict[str, float | int | List[str] | List[Dict[str, object]]]:
+def _collect_weekly_stats(
+    db: Session,
+    user_id: UUID,
+    base_date: date | None = None,
+) -> Dict[str, float | int | List[str] | List[Dict[str, object]]]:
     """Return counts/notes for the trailing seven-day window plus per-resolution stats."""
-    today = date.today()
+    return _collect_weekly_stats_bulk(db, [user_id], base_date)[user_id]
+
+
+def _collect_weekly_stats_bulk(
+    db: Session,
+    user_ids: List[UUID],
+    base_date: date | None = None,
+) -> Dict[UUID, Dict[str, float | int | List[str] | List[Dict[str, object]]]]:
+    """Aggregate window task counts in SQL for many users and summarize per user."""
+    today = base_date or date.today()
     window_start = today - timedelta(days=6)
 
-    active_resolutions = (
-        db.query(Resolution)
-        .filter(Resolution.user_id == user_id, Resolution.status == "active")
-        .all()
-    )
-    scheduled_tasks = (
-        db.query(Task)
-        .filter(
-            Task.user_id == user_id,
+    resolutions_by_user: Dict[UUID, List[Resolution]] = {user_id: [] for user_id in user_ids}
+    counts_by_user: Dict[UUID, Dict[UUID | None, Tuple[int, int]]] = {user_id: {} for user_id in user_ids}
+    notes_by_user: Dict[UUID, List[str]] = {user_id: [] for user_id in user_ids}
+    if user_ids:
+        active_resolutions = (
+            db.query(Resolution)
+            .filter(Resolution.user_id.in_(user_ids), Resolution.status == "active")
+            .all()
+        )
+        for resolution in active_resolutions:
+            resolutions_by_user[resolution.user_id].append(resolution)
+
+        in_window = (
+            Task.user_id.in_(user_ids),
             Task.scheduled_day.isnot(None),
             Task.scheduled_day >= window_start,
             Task.scheduled_day <= today,
+            _not_draft(),
         )
-        .all()
-    )
+        completed_in_window = and_(
+            Task.completed.is_(True),
+            Task.completed_at >= datetime.combine(window_start, time.min),
+            Task.completed_at < datetime.combine(today + timedelta(days=1), time.min),
+        )
+        counts = (
+            db.query(
+                Task.user_id,
+                Task.resolution_id,
+                func.count(),
+                func.count(case((completed_in_window, 1))),
+            )
+            .filter(*in_window)
+            .group_by(Task.user_id, Task.resolution_id)
+            .all()
+        )
+        for user_id, resolution_id, total, completed in counts:
+            counts_by_user[user_id][resolution_id] = (total, completed)
 
-    notes: List[str] = []
-    total_tasks = 0
-    completed_tasks = 0
-    tasks_by_resolution: Dict[UUID, List[Task]] = {}
-    for task in scheduled_tasks:
-        metadata = task.metadata_json or {}
-        if metadata.get("draft"):
-            continue
-        total_tasks += 1
-        if (
-            task.completed
-            and task.completed_at
-            and window_start <= task.completed_at.date() <= today
-        ):
-            completed_tasks += 1
-        note = metadata.get("note")
-        if isinstance(note, str) and note.strip():
-            notes.append(note.strip())
-        if task.resolution_id:
-            tasks_by_resolution.setdefault(task.resolution_id, []).append(task)
+        note = json_field_text(Task.metadata_json, "note")
+        for user_id, text in db.query(Task.user_id, note).filter(*in_window, note.isnot(None)).all():
+            if text.strip():
+                notes_by_user[user_id].append(text.strip())
+
+    return {
+        user_id: _summarize_weekly_stats(resolutions_by_user[user_id], counts_by_user[user_id], notes_by_user[user_id])
+        for user_id in user_ids
+    }
+
+
+def _not_draft() -> ColumnElement:
+    # SQLite renders JSON true as 1 through ->>, Postgres as 'true'.
+    draft = cast(json_field_text(Task.metadata_json, "draft"), Text)
+    return or_(draft.is_(None), draft.notin_(("true", "1")))
+
+
+def _summarize_weekly_stats(
+    active_resolutions: List[Resolution],
+    counts_by_resolution: Dict[UUID | None, Tuple[int, int]],
+    notes: List[str],
+) -> Dict[str, float | int | List[str] | List[Dict[str, object]]]:
+    total_tasks = sum(total for total, _ in counts_by_resolution.values())
+    completed_tasks = sum(completed for _, completed in counts_by_resolution.values())
 
     completion_rate = round((completed_tasks / total_tasks), 2) if total_tasks else 0.0
     resolution_stats: List[Dict[str, object]] = []
     for resolution in active_resolutions:
-        res_tasks = tasks_by_resolution.get(resolution.id, [])
-        res_total = len(res_tasks)
-        res_completed = sum(
-            1
-            for item in res_tasks
-            if item.completed and item.completed_at and window_start <= item.completed_at.date() <= today
-        )
+        res_total, res_completed = counts_by_resolution.get(resolution.id, (0, 0))
         res_completion = round((res_completed / res_total), 2) if res_total else 0.0
         resolution_stats.append(
             {
@@ -319,7 +512,123 @@ def _request_plan_from_llm(
     if not api_key:
         return _fallback_micro_resolution(focus_title)
 
-    client = openai.OpenAI(api_key=api_key)
+    messages = _plan_messages(context_summary, resolution_stats, focus_resolution, availability_profile)
+    cache_key = _plan_cache_key(messages)
+    cached = _cached_plan(cache_key)
+    if cached is not None:
+        return cached
+    client = _openai_client(api_key)
+    try:
+        completion = client.chat.completions.create(messages=messages, **_PLAN_COMPLETION_OPTIONS)
+        micro = _micro_resolution_from_completion(completion)
+    except Exception:
+        return _fallback_micro_resolution(focus_title)
+    _remember_plan(cache_key, micro)
+    return micro
+
+
+@lru_cache(maxsize=1)
+def _openai_client(api_key: str) -> openai.OpenAI:
+    """Return the planner's OpenAI client for ``api_key``; all users in a sync run go through it."""
+    return build_openai_client(api_key)
+
+
+def _request_plans_concurrently(plan_contexts: List[WeeklyPlanContext]) -> List[MicroResolutionPayload]:
+    """Request micro-resolutions for several users at once, bounded by settings.llm_concurrency."""
+    if not plan_contexts:
+        return []
+    api_key = os.environ.get("OPENAI_API_KEY")
+    results: List[MicroResolutionPayload | None] = [
+        None if api_key and _needs_llm(plan_context) else _fallback_micro_resolution(_focus_title(plan_context))
+        for plan_context in plan_contexts
+    ]
+    pending = [index for index, micro in enumerate(results) if micro is None]
+    if pending:
+        replies = asyncio.run(_request_plans_async(api_key, [plan_contexts[index] for index in pending]))
+        for index, micro in zip(pending, replies):
+            results[index] = micro
+    return results
+
+
+def _needs_llm(plan_context: WeeklyPlanContext) -> bool:
+    """Users with no active goals and no tasks last week get the reset plan without an LLM call."""
+    if not settings.skip_llm_for_empty_cohort:
+        return True
+    inputs = plan_context.inputs
+    return bool(inputs.active_resolutions or inputs.active_tasks_total)
+
+
+async def _request_plans_async(api_key: str, plan_contexts: List[WeeklyPlanContext]) -> List[MicroResolutionPayload]:
+    # The async client's connection pool is bound to this event loop, so it lives for one batch.
+    semaphore = asyncio.Semaphore(max(1, settings.llm_concurrency))
+    async with build_async_openai_client(api_key) as client:
+        return await asyncio.gather(
+            *(_request_plan_from_llm_async(client, semaphore, plan_context) for plan_context in plan_contexts)
+        )
+
+
+async def _request_plan_from_llm_async(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    plan_context: WeeklyPlanContext,
+) -> MicroResolutionPayload:
+    messages = _plan_messages(
+        plan_context.context_summary,
+        plan_context.resolution_stats,
+        plan_context.focus_resolution,
+        plan_context.availability_profile,
+    )
+    cache_key = _plan_cache_key(messages)
+    cached = _cached_plan(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        async with semaphore:
+            completion = await client.chat.completions.create(messages=messages, **_PLAN_COMPLETION_OPTIONS)
+        micro = _micro_resolution_from_completion(completion)
+    except Exception:
+        return _fallback_micro_resolution(_focus_title(plan_context))
+    _remember_plan(cache_key, micro)
+    return micro
+
+
+def _plan_cache_key(messages: List[Dict[str, str]]) -> str:
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _cached_plan(cache_key: str) -> MicroResolutionPayload | None:
+    with _plan_cache_lock:
+        entry = _plan_cache.get(cache_key)
+        if entry is None:
+            return None
+        stored_at, raw = entry
+        if monotonic() - stored_at >= _PLAN_CACHE_TTL_SECONDS:
+            del _plan_cache[cache_key]
+            return None
+        _plan_cache.move_to_end(cache_key)
+    return MicroResolutionPayload.model_validate_json(raw)
+
+
+def _remember_plan(cache_key: str, micro: MicroResolutionPayload) -> None:
+    """Store only successful LLM plans; fallbacks are cheap and should not mask later recoveries."""
+    raw = micro.model_dump_json()
+    with _plan_cache_lock:
+        _plan_cache[cache_key] = (monotonic(), raw)
+        _plan_cache.move_to_end(cache_key)
+        while len(_plan_cache) > _PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+
+
+def _focus_title(plan_context: WeeklyPlanContext) -> str | None:
+    return plan_context.focus_resolution["title"] if plan_context.focus_resolution else None
+
+
+def _plan_messages(
+    context_summary: str,
+    resolution_stats: List[ResolutionWeeklyStat],
+    focus_resolution: Dict[str, object] | None,
+    availability_profile: Dict[str, object] | None,
+) -> List[Dict[str, str]]:
     serialized_stats = json.dumps(
         [
             {
@@ -333,38 +642,21 @@ def _request_plan_from_llm(
         focus_resolution["domain"] if focus_resolution else None,
         availability_profile or {},
     )
-    system_prompt = (
-        "You are Sarthi AI, a strategic coach. Review the user's last week and design the next. "
-        "If they struggled (<50%), simplify and focus on consistency. "
-        "If they crushed it (>80%), gently increase intensity or variety."
-    )
-    user_prompt = (
-        f"Context: {context_summary}\n"
-        f"Resolution stats JSON: {serialized_stats}\n"
-        f"Availability guidance: {availability_hint or 'standard working hours'}\n"
-        "Focus on the lowest-performing resolution unless all are above 80% completion.\n"
-        "Generate a 'Micro-Resolution' JSON object with keys 'title', 'why_this', "
-        "and 'suggested_week_1_tasks'. Include 3-5 specific tasks for the upcoming week. "
-        "Each task must contain 'title', 'duration_min' (integer minutes), "
-        "and 'suggested_time' (morning, afternoon, or evening)."
+    user_prompt = _PLAN_USER_PROMPT.format(
+        context=context_summary,
+        stats=serialized_stats,
+        availability=availability_hint or "standard working hours",
     )
+    return [
+        {"role": "system", "content": _PLAN_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    try:
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"},
-            temperature=0.6,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
-        content = completion.choices[0].message.content or "{}"
-        payload = json.loads(content)
-        micro = MicroResolutionPayload.model_validate(payload)
-        return _ensure_task_bounds(micro)
-    except Exception:
-        return _fallback_micro_resolution(focus_title)
+
+def _micro_resolution_from_completion(completion) -> MicroResolutionPayload:
+    content = completion.choices[0].message.content or "{}"
+    micro = MicroResolutionPayload.model_validate_json(content)
+    return _ensure_task_bounds(micro)
 
 
 def _fallback_micro_resolution(focus_title: str | None = None) -> MicroResolutionPayload:
@@ -373,24 +665,19 @@ def _fallback_micro_resolution(focus_title: str | None = None) -> MicroResolutio
     return MicroResolutionPayload(
         title=title,
         why_this="Lighten the load, rebuild confidence, and carry momentum into the following week.",
-        suggested_week_1_tasks=[
-            SuggestedTaskPayload(title="Schedule three 30-min focus blocks", duration_min=30, suggested_time="morning"),
-            SuggestedTaskPayload(title="One midweek reflection note", duration_min=10, suggested_time="evening"),
-            SuggestedTaskPayload(title="Weekend reset + planning ritual", duration_min=25, suggested_time="afternoon"),
-        ],
+        suggested_week_1_tasks=_fallback_tasks(),
     )
 
 
+def _fallback_tasks() -> List[SuggestedTaskPayload]:
+    return [task.model_copy() for task in _FALLBACK_TASKS]
+
+
 def _ensure_task_bounds(micro: MicroResolutionPayload) -> MicroResolutionPayload:
     """Clamp task count to 3-5 entries, padding with fallback tasks if needed."""
-    tasks = list(micro.suggested_week_1_tasks or [])
-    fallback_tasks = _fallback_micro_resolution().suggested_week_1_tasks
-    idx = 0
-    while len(tasks) < 3 and idx < len(fallback_tasks):
-        tasks.append(fallback_tasks[idx])
-        idx += 1
-    if len(tasks) > 5:
-        tasks = tasks[:5]
+    tasks = list(micro.suggested_week_1_tasks or [])[:5]
+    if len(tasks) < 3:
+        tasks = (tasks + _fallback_tasks())[:3]
 
     return MicroResolutionPayload(
         title=micro.title or "Momentum Week",
@@ -404,9 +691,9 @@ def _materialize_tasks_from_plan(
     user_id: UUID,
     micro_resolution: MicroResolutionPayload,
     week_start: date,
-) -> List[Task]:
-    """Create concrete Task rows from the suggested payload."""
-    created: List[Task] = []
+) -> List[UUID]:
+    """Insert concrete Task rows for the suggested payload in one statement; return their ids."""
+    rows: List[Dict[str, object]] = []
     suggestions = micro_resolution.suggested_week_1_tasks or []
     week_end = week_start + timedelta(days=6)
     occupied = _load_existing_schedule_map(db, user_id, week_start, week_end)
@@ -427,36 +714,30 @@ def _materialize_tasks_from_plan(
             "suggested_time": suggestion.suggested_time,
         }
         duration_minutes = suggestion.duration_min or 30
-        task = Task(
-            user_id=user_id,
-            resolution_id=None,
-            title=suggestion.title,
-            duration_min=duration_minutes,
-            scheduled_day=scheduled_day,
-            scheduled_time=scheduled_time,
-            metadata_json=metadata,
-            completed=False,
-            completed_at=None,
+        rows.append(
+            {
+                "user_id": user_id,
+                "resolution_id": None,
+                "title": suggestion.title,
+                "duration_min": duration_minutes,
+                "scheduled_day": scheduled_day,
+                # Bulk inserts bypass ORM flush events, so apply the listener's rules here.
+                "scheduled_time": localize_scheduled_time(scheduled_day, scheduled_time),
+                "scheduled_at_utc": scheduled_at_utc_for(scheduled_day, scheduled_time),
+                "metadata_json": metadata,
+                "completed": False,
+                "completed_at": None,
+            }
         )
-        db.add(task)
-        created.append(task)
 
-    db.flush()
-    return created
+    if not rows:
+        return []
+    return list(db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows))
 
 
 def _map_suggested_time(label: str | None) -> time | None:
     """Translate coarse labels to representative times."""
-    if not label:
-        return None
-    label = label.lower()
-    if label == "morning":
-        return time(hour=9, minute=0)
-    if label == "afternoon":
-        return time(hour=13, minute=0)
-    if label == "evening":
-        return time(hour=19, minute=0)
-    return None
+    return _SUGGESTED_TIMES.get(label.lower()) if label else None
 
 
 def _load_existing_schedule_map(db: Session, user_id: UUID, week_start: date, week_end: date) -> Dict[date, Set[time]]:
@@ -537,15 +818,14 @@ def _find_existing_snapshot(
     week_start: str,
     week_end: str,
 ) -> AgentActionLog | None:
-    logs = (
+    return (
         db.query(AgentActionLog)
-        .filter(AgentActionLog.user_id == user_id, AgentActionLog.action_type == action_type)
+        .filter(
+            AgentActionLog.user_id == user_id,
+            AgentActionLog.action_type == action_type,
+            json_field_text(AgentActionLog.action_payload, "week_start") == week_start,
+            json_field_text(AgentActionLog.action_payload, "week_end") == week_end,
+        )
         .order_by(AgentActionLog.created_at.desc())
-        .limit(100)
-        .all()
+        .first()
     )
-    for log in logs:
-        payload = log.action_payload or {}
-        if payload.get("week_start") == week_start and payload.get("week_end") == week_end:
-            return log
-    return None
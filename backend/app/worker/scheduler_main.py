@@ -5,6 +5,7 @@ import logging
 import signal
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from time import perf_counter
 from datetime import datetime, timezone
 
@@ -30,7 +31,7 @@ except ImportError:  # pragma: no cover
 from app.core.config import settings
 from app.core.logging import configure_logging
 from app.observability.client import init_opik
-from app.observability.metrics import log_metric
+from app.observability.metrics import log_metrics
 from app.observability.tracing import trace
 from app.db.session import SessionLocal
 from app.services.job_runner import (
@@ -40,7 +41,8 @@ from app.services.job_runner import (
 from app.services.task_reminder import run_task_reminder_check
 
 
-def main() -> None:
+def main(stop_event: threading.Event | None = None) -> None:
+    """Run the worker until SIGINT/SIGTERM, or until ``stop_event`` is set when the caller supplies one."""
     configure_logging(log_level=settings.log_level)
     init_opik()
     try:
@@ -77,9 +79,14 @@ def main() -> None:
     scheduler.start()
     if settings.jobs_run_on_startup:
         logger.info("Running jobs once on startup")
-        _run_weekly_plan_job()
-        _run_intervention_job()
-        _run_task_reminder_job()
+        _run_startup_jobs()
+
+    if stop_event is not None:
+        # The caller owns the lifecycle, so leave process signal handlers alone.
+        stop_event.wait()
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        return
 
     stop_event = threading.Event()
 
@@ -139,6 +146,15 @@ def _register_jobs(scheduler: BackgroundScheduler) -> None:
     )
 
 
+def _run_startup_jobs() -> None:
+    """Run every job once, side by side; each opens its own session and logs its own failures."""
+    jobs = (_run_weekly_plan_job, _run_intervention_job, _run_task_reminder_job)
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="startup-job") as executor:
+        futures = [executor.submit(job) for job in jobs]
+        for future in futures:
+            future.result()
+
+
 def _run_weekly_plan_job() -> None:
     _execute_job(
         job_name="weekly_plan",
@@ -165,6 +181,8 @@ def _run_task_reminder_job() -> None:
 
 def _execute_job(job_name: str, runner, scheduled_run_time=None) -> None:
     session = SessionLocal()
+    # Jobs commit per user and then read what they wrote; keep those instances loaded across commits.
+    session.expire_on_commit = False
     start = perf_counter()
     scheduled_str = scheduled_run_time.isoformat() if scheduled_run_time else None
     metadata = {"job": job_name, "scheduled_run_time": scheduled_str}
@@ -187,11 +205,17 @@ def _execute_job(job_name: str, runner, scheduled_run_time=None) -> None:
         session.close()
 
     duration_ms = (perf_counter() - start) * 1000
-    log_metric("jobs.success", success, metadata={"job": job_name})
-    log_metric("jobs.users_processed", users_processed, metadata={"job": job_name})
-    log_metric("jobs.snapshots_written", snapshots_written, metadata={"job": job_name})
-    log_metric("jobs.skipped_due_to_preferences", skipped, metadata={"job": job_name})
-    log_metric("jobs.duration_ms", duration_ms, metadata={"job": job_name})
+    log_metrics(
+        "jobs",
+        {
+            "jobs.success": success,
+            "jobs.users_processed": users_processed,
+            "jobs.snapshots_written": snapshots_written,
+            "jobs.skipped_due_to_preferences": skipped,
+            "jobs.duration_ms": duration_ms,
+        },
+        metadata={"job": job_name},
+    )
 
     if success:
         logger.info(
@@ -222,6 +246,7 @@ def _validate_config() -> None:
 
 
 def _wait_forever(stop_event: threading.Event) -> None:
+    # Blocks without polling; SIGINT/SIGTERM handlers and set() from other threads both wake it.
     stop_event.wait()
 
 
@@ -0,0 +1,100 @@
+"""Request and seeding helpers shared by the API test modules."""
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from app.db.models.resolution import Resolution
+from app.db.models.task import Task
+from app.db.models.user import User
+
+
+def seed_user(session_factory) -> UUID:
+    user_id = uuid4()
+    with session_factory.begin() as session:
+        session.add(User(id=user_id))
+    return user_id
+
+
+def seed_decomposed_resolution(
+    session_factory,
+    *,
+    task_count: int = 3,
+    duration_weeks: int = 8,
+    user_id: UUID | None = None,
+) -> tuple[UUID, UUID]:
+    """Insert a draft resolution with a stored plan and draft week-one tasks, bypassing /decompose.
+
+    Use for tests that only need the post-decomposition state; tests of the decompose flow itself
+    should keep going through create_and_decompose.
+    """
+    actual_user = user_id or uuid4()
+    with session_factory.begin() as session:
+        if session.get(User, actual_user) is None:
+            session.add(User(id=actual_user))
+            session.flush()
+        resolution = Resolution(
+            user_id=actual_user,
+            title="Mindful morning routine",
+            type="habit",
+            duration_weeks=duration_weeks,
+            status="draft",
+            metadata_json={
+                "raw_text": "Build a mindful morning routine to support focus.",
+                "plan_v1": {
+                    "resolution_title": "Mindful morning routine",
+                    "duration_weeks": duration_weeks,
+                    "milestones": [
+                        {"week_number": 1, "focus_summary": "Settle into a calm start", "success_criteria": []},
+                    ],
+                },
+            },
+        )
+        session.add(resolution)
+        session.flush()
+        session.execute(
+            insert(Task),
+            [
+                {
+                    "user_id": actual_user,
+                    "resolution_id": resolution.id,
+                    "title": f"Morning focus block {index + 1}",
+                    "duration_min": 20,
+                    "metadata_json": {"draft": True, "source": "ai_decomposer"},
+                }
+                for index in range(task_count)
+            ],
+        )
+    return resolution.id, actual_user
+
+
+async def create_resolution(
+    test_client: AsyncClient,
+    *,
+    duration_weeks: int | None = 8,
+    user_id: UUID | None = None,
+) -> tuple[UUID, UUID]:
+    actual_user = user_id or uuid4()
+    payload = {
+        "user_id": str(actual_user),
+        "text": "Build a mindful morning routine to support focus.",
+        "duration_weeks": duration_weeks,
+    }
+    response = await test_client.post("/resolutions", json=payload)
+    assert response.status_code == 201
+    data = response.json()
+    return UUID(data["id"]), actual_user
+
+
+async def create_and_decompose(
+    test_client: AsyncClient,
+    *,
+    duration_weeks: int | None = 8,
+    user_id: UUID | None = None,
+) -> tuple[UUID, UUID, list[dict]]:
+    resolution_id, actual_user = await create_resolution(test_client, duration_weeks=duration_weeks, user_id=user_id)
+    response = await test_client.post(f"/resolutions/{resolution_id}/decompose")
+    assert response.status_code == 200
+    return resolution_id, actual_user, response.json()["week_1_tasks"]
@@ -0,0 +1,107 @@
+"""Shared fixtures for API tests backed by one in-memory SQLite database."""
+from __future__ import annotations
+
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.deps import get_db
+from app.db.models.agent_action_log import AgentActionLog
+from app.db.models.resolution import Resolution
+from app.db.models.task import Task
+from app.db.models.user import User
+from app.db.models.user_preferences import UserPreferences
+from app.main import app
+from app.observability import tracing
+
+# Parents before children, so deleting in reverse order respects foreign keys.
+_API_TABLES = (
+    User.__table__,
+    UserPreferences.__table__,
+    Resolution.__table__,
+    Task.__table__,
+    AgentActionLog.__table__,
+)
+
+
+@pytest.fixture(scope="session")
+def sqlite_engine():
+    """Create the engine and schema once per process."""
+    # A named shared-cache database lets extra connections reach the same in-memory data; the name is per
+    # xdist worker so parallel processes never address each other's database.
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    engine = create_engine(
+        f"sqlite+pysqlite:///file:memdb_{worker_id}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False, "uri": True},
+        poolclass=StaticPool,
+        future=True,
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):  # pragma: no cover - sqlite setup
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        # The database is throwaway, so skip durability bookkeeping.
+        for pragma in (
+            "synchronous=OFF",
+            "journal_mode=MEMORY",
+            "locking_mode=EXCLUSIVE",
+            "temp_store=MEMORY",
+            "cache_size=-20000",
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    Base.metadata.create_all(engine, tables=list(_API_TABLES), checkfirst=False)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _opik_disabled(request, monkeypatch):
+    """Keep traces as no-ops unless a test is marked ``opik``."""
+    if request.node.get_closest_marker("opik"):
+        return
+    monkeypatch.setenv("OPIK_ENABLED", "false")
+    monkeypatch.setattr(tracing, "get_opik_client", lambda: None)
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture()
+async def client(anyio_backend, sqlite_engine):
+    """Yield (AsyncClient, session factory) over the shared engine; rows are cleared after each test."""
+    TestingSessionLocal = sessionmaker(
+        bind=sqlite_engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        future=True,
+    )
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        # Calls the ASGI app in-process without running startup hooks; no test here relies on them.
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://testserver") as test_client:
+            yield test_client, TestingSessionLocal
+    finally:
+        app.dependency_overrides.clear()
+        with sqlite_engine.begin() as connection:
+            for table in reversed(_API_TABLES):
+                connection.execute(table.delete())
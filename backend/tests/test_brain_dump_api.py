@@ -44,8 +44,7 @@ def client():
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client, TestingSessionLocal
+    yield TestClient(app), TestingSessionLocal
     app.dependency_overrides.clear()
 
 
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
 from uuid import uuid4
 
 from sqlalchemy import create_engine, event
@@ -12,6 +15,7 @@ from app.db.models.resolution import Resolution
 from app.db.models.task import Task
 from app.db.models.user import User
 from app.db.models.user_preferences import UserPreferences
+from app.services import weekly_planner
 from app.services.job_runner import (
     run_interventions_for_all_users,
     run_interventions_for_user,
@@ -125,6 +129,164 @@ def test_weekly_plan_job_runner_dedup():
     session.close()
 
 
+def test_weekly_plan_job_runner_overlaps_llm_calls(monkeypatch):
+    in_flight = {"current": 0, "peak": 0}
+    client_options = []
+
+    class FakeCompletions:
+        async def create(self, **kwargs):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            content = json.dumps(
+                {
+                    "title": "Steady Week",
+                    "why_this": "Keep momentum.",
+                    "suggested_week_1_tasks": [
+                        {"title": f"Session {idx}", "duration_min": 20, "suggested_time": "morning"} for idx in range(3)
+                    ],
+                }
+            )
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            client_options.append(kwargs)
+            self.chat = SimpleNamespace(completions=FakeCompletions())
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(weekly_planner.openai, "AsyncOpenAI", FakeAsyncOpenAI)
+    Session = _session()
+    for _ in range(3):
+        _seed_resolution(Session, _seed_user(Session))
+
+    session = Session()
+    result = run_weekly_plan_for_all_users(session)
+    assert result.users_processed == 3
+    assert result.snapshots_written == 3
+    assert in_flight["peak"] > 1
+    assert [options["max_retries"] for options in client_options] == [2]
+    assert client_options[0]["timeout"].read == 60.0
+    logs = session.query(AgentActionLog).filter(AgentActionLog.action_type == "weekly_plan_generated").all()
+    assert {log.action_payload["micro_resolution"]["title"] for log in logs} == {"Steady Week"}
+    session.close()
+
+
+def test_weekly_plan_reuses_cached_plan_for_identical_context(monkeypatch):
+    calls = []
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            content = json.dumps(
+                {
+                    "title": "Fresh Start",
+                    "why_this": "Build a base.",
+                    "suggested_week_1_tasks": [
+                        {"title": f"Step {idx}", "duration_min": 15, "suggested_time": "evening"} for idx in range(3)
+                    ],
+                }
+            )
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(weekly_planner.openai, "OpenAI", FakeOpenAI)
+    weekly_planner._openai_client.cache_clear()
+    weekly_planner._plan_cache.clear()
+
+    first = weekly_planner._request_plan_from_llm("0 active goals", [], None, None)
+    second = weekly_planner._request_plan_from_llm("0 active goals", [], None, None)
+    weekly_planner._request_plan_from_llm("2 active goals", [], None, None)
+
+    assert first == second
+    assert first is not second
+    assert len(calls) == 2
+    weekly_planner._openai_client.cache_clear()
+    weekly_planner._plan_cache.clear()
+
+
+def test_weekly_plan_cache_entries_expire_after_a_day(monkeypatch):
+    calls = []
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            content = json.dumps(
+                {
+                    "title": f"Plan {len(calls)}",
+                    "why_this": "Build a base.",
+                    "suggested_week_1_tasks": [
+                        {"title": f"Step {idx}", "duration_min": 15, "suggested_time": "evening"} for idx in range(3)
+                    ],
+                }
+            )
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(completions=FakeCompletions())
+
+    now = [1000.0]
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(weekly_planner.openai, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(weekly_planner, "monotonic", lambda: now[0])
+    weekly_planner._openai_client.cache_clear()
+    weekly_planner._plan_cache.clear()
+
+    first = weekly_planner._request_plan_from_llm("0 active goals", [], None, None)
+    now[0] += weekly_planner._PLAN_CACHE_TTL_SECONDS - 1
+    assert weekly_planner._request_plan_from_llm("0 active goals", [], None, None) == first
+    now[0] += 1
+    refreshed = weekly_planner._request_plan_from_llm("0 active goals", [], None, None)
+
+    assert len(calls) == 2
+    assert refreshed.title == "Plan 2"
+    weekly_planner._openai_client.cache_clear()
+    weekly_planner._plan_cache.clear()
+
+
+def test_fallback_plans_do_not_share_task_instances():
+    first = weekly_planner._fallback_micro_resolution("Run a 5k")
+    second = weekly_planner._fallback_micro_resolution()
+    first.suggested_week_1_tasks[0].suggested_time = "evening"
+
+    assert second.suggested_week_1_tasks[0].suggested_time == "morning"
+    assert weekly_planner._FALLBACK_TASKS[0].suggested_time == "morning"
+
+
+def test_weekly_plan_skips_llm_for_users_without_history(monkeypatch):
+    class FailingAsyncOpenAI:
+        def __init__(self, **kwargs):
+            raise AssertionError("LLM should not be called for an empty cohort")
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(weekly_planner.openai, "AsyncOpenAI", FailingAsyncOpenAI)
+    Session = _session()
+    user_id = _seed_user(Session)
+
+    session = Session()
+    result = run_weekly_plan_for_all_users(session, user_ids=[user_id])
+    assert result.snapshots_written == 1
+    log = (
+        session.query(AgentActionLog)
+        .filter(AgentActionLog.user_id == user_id, AgentActionLog.action_type == "weekly_plan_generated")
+        .one()
+    )
+    assert log.action_payload["micro_resolution"]["title"] == "Reset Week"
+    session.close()
+
+
 def test_intervention_job_runner_counts():
     Session = _session()
     user_id = _seed_user(Session)
@@ -50,8 +50,7 @@ def client(monkeypatch):
 
     app.dependency_overrides[get_db] = override_get_db
     monkeypatch.setattr(settings, "debug", True)
-    with TestClient(app) as test_client:
-        yield test_client, TestingSessionLocal
+    yield TestClient(app), TestingSessionLocal
     app.dependency_overrides.clear()
 
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+import pytest
+
 from app.observability import metrics
 from app.observability import tracing
 
@@ -36,3 +38,24 @@ def test_log_metric_closes_trace(monkeypatch) -> None:
     assert dummy_client.traces[0].metadata["value"] == 42
     assert dummy_client.traces[0].metadata["foo"] == "bar"
     assert dummy_client.traces[0].ended is True
+
+
+def test_log_metrics_records_single_trace(monkeypatch) -> None:
+    dummy_client = _DummyClient()
+    monkeypatch.setattr(tracing, "get_opik_client", lambda: dummy_client)
+
+    metrics.log_metrics("jobs", {"jobs.success": 1, "jobs.duration_ms": 12.5}, metadata={"job": "weekly_plan"})
+
+    assert len(dummy_client.traces) == 1
+    assert dummy_client.traces[0].metadata == {"jobs.success": 1, "jobs.duration_ms": 12.5, "job": "weekly_plan"}
+    assert dummy_client.traces[0].ended is True
+
+
+def test_log_metrics_rejects_metadata_overwriting_a_metric(monkeypatch) -> None:
+    dummy_client = _DummyClient()
+    monkeypatch.setattr(tracing, "get_opik_client", lambda: dummy_client)
+
+    with pytest.raises(ValueError, match="jobs.success"):
+        metrics.log_metrics("jobs", {"jobs.success": 1}, metadata={"jobs.success": "weekly_plan"})
+
+    assert not dummy_client.traces
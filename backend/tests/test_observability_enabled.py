@@ -67,6 +67,7 @@ def sqlite_override():
     return override_get_db
 
 
+@pytest.mark.opik
 @pytest.mark.skipif("OPIK_API_KEY" not in os.environ, reason="OPIK_API_KEY env var required for Opik tests")
 def test_app_runs_with_opik_enabled(monkeypatch, sqlite_override):
     api_key = os.environ["OPIK_API_KEY"]
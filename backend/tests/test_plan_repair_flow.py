@@ -1,8 +1,11 @@
 import json
 import os
+from types import SimpleNamespace
 
 import pytest
 
+from app.core.config import settings
+from app.services import resolution_decomposer
 from app.services.resolution_decomposer import decompose_resolution_with_llm
 
 
@@ -15,11 +18,7 @@ class _FakeChatCompletions:
             raise RuntimeError("No more fake responses")
         content = self.outer.responses[self.outer.call_index]
         self.outer.call_index += 1
-        return type("FakeCompletion", (), {
-            "choices": [
-                type("Choice", (), {"message": type("Message", (), {"content": content})})
-            ]
-        })()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
 
 
 class _FakeChat:
@@ -65,7 +64,10 @@ def _build_plan_json(task_title: str, duration: int) -> str:
 @pytest.fixture(autouse=True)
 def _set_api_key(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    resolution_decomposer._client_for.cache_clear()
     yield
+    resolution_decomposer._client_for.cache_clear()
     os.environ.pop("OPENAI_API_KEY", None)
 
 
@@ -73,7 +75,7 @@ def test_plan_repair_succeeds_after_retry(monkeypatch):
     bad_plan = _build_plan_json("Practice", 20)
     good_plan = _build_plan_json("Practice major scales hands separately", 30)
     fake_client = FakeOpenAI([bad_plan, good_plan])
-    monkeypatch.setattr("openai.OpenAI", lambda api_key: fake_client)
+    monkeypatch.setattr("openai.OpenAI", lambda **kwargs: fake_client)
 
     plan = decompose_resolution_with_llm(
         user_input="Master piano",
@@ -95,7 +97,7 @@ def test_plan_repair_succeeds_after_retry(monkeypatch):
 def test_plan_repair_falls_back_when_second_attempt_fails(monkeypatch):
     bad_plan = _build_plan_json("Practice", 200)
     fake_client = FakeOpenAI([bad_plan, bad_plan])
-    monkeypatch.setattr("openai.OpenAI", lambda api_key: fake_client)
+    monkeypatch.setattr("openai.OpenAI", lambda **kwargs: fake_client)
 
     plan = decompose_resolution_with_llm(
         user_input="Master piano",
@@ -13,6 +13,7 @@ from app.db.models.resolution import Resolution
 from app.db.models.task import Task
 from app.db.models.user import User
 from app.main import app
+from app.observability import tracing
 
 
 @pytest.fixture()
@@ -43,8 +44,7 @@ def client():
             db.close()
 
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client, TestingSessionLocal
+    yield TestClient(app), TestingSessionLocal
     app.dependency_overrides.clear()
 
 
@@ -120,13 +120,10 @@ def test_decomposition_missing_resolution_returns_404(client):
     assert response.status_code == 404
 
 
-def test_decomposition_handles_disabled_observability(monkeypatch, client):
+def test_decomposition_handles_disabled_observability(client):
     test_client, session_factory = client
     resolution_id = _create_resolution_via_api(test_client)
-
-    import app.observability.client as opik_client
-
-    monkeypatch.setattr(opik_client, "get_opik_client", lambda: None)
+    assert tracing.get_opik_client() is None
 
     response = test_client.post(f"/resolutions/{resolution_id}/decompose", json={"weeks": 4})
     assert response.status_code == 200
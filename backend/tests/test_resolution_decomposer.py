@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.core.config import settings
+from app.services import resolution_decomposer
+from app.services.resolution_decomposer import (
+    _detect_specialty_key,
+    _evaluate_with_observability,
+    _expand_target_days,
+    _plan_completion_token_budget,
+)
+
+
+def test_detect_specialty_prefers_earlier_config_entry():
+    # "strength" is a fitness keyword and "music" a music keyword; music is declared first.
+    assert _detect_specialty_key("Music and strength sessions", None) == "music_skill"
+    assert _detect_specialty_key("Guitar practice", "skill") == "music_skill"
+
+
+def test_detect_specialty_resolves_two_matching_specialties_by_declaration_order():
+    # "running" is a fitness keyword and "morning"/"routine" are habit keywords; both allow habit goals.
+    assert _detect_specialty_key("Morning running routine", "habit") == "fitness"
+    assert _detect_specialty_key("Morning running routine", None) == "fitness"
+
+
+def test_detect_specialty_respects_resolution_type():
+    # Music keywords only apply to skill/learning goals, so a habit falls through to habit keywords.
+    assert _detect_specialty_key("Morning guitar routine", "habit") == "habit"
+    assert _detect_specialty_key("Run a 5k", "health") == "fitness"
+
+
+def test_detect_specialty_falls_back_to_type_default():
+    assert _detect_specialty_key("Read more novels", "learning") == "skill_generic"
+    assert _detect_specialty_key("Read more novels", None) == "generic"
+
+
+def test_plan_completion_token_budget_scales_with_weeks():
+    assert _plan_completion_token_budget(4) < _plan_completion_token_budget(8) < _plan_completion_token_budget(12)
+    # Unknown or out-of-range durations are clamped to the 4-12 week planning window.
+    assert _plan_completion_token_budget(None) == _plan_completion_token_budget(12)
+    assert _plan_completion_token_budget(1) == _plan_completion_token_budget(4)
+
+
+def test_evaluation_cache_reuses_result_for_identical_plan(monkeypatch):
+    calls = []
+    original = resolution_decomposer.evaluate_plan
+
+    def counting_evaluate(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(resolution_decomposer, "evaluate_plan", counting_evaluate)
+    plan = {"weeks": [{"week": 1, "tasks": [{"title": "Run three easy miles", "estimated_duration_min": 30}]}]}
+    cache = {}
+
+    first = _evaluate_with_observability(plan, "medium", "health", None, {}, {}, cache)
+    second = _evaluate_with_observability(dict(plan), "medium", "health", None, {}, {}, cache)
+
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_expand_target_days_dispatches_cadence_aliases():
+    monday = date(2026, 1, 5)
+    assert _expand_target_days({"type": "daily"}, monday, False, None)[-1] == date(2026, 1, 11)
+    assert _expand_target_days({"type": "twice_per_week"}, monday, False, None) == _expand_target_days(
+        {"type": "x_per_week", "count": 2}, monday, False, None
+    )
+    assert len(_expand_target_days({"type": "5x_per_week"}, monday, False, None)) == 5
+    assert len(_expand_target_days({"type": "12x_per_week"}, monday, False, None)) == 7
+    assert _expand_target_days({"type": "specific_days", "days": ["friday"]}, monday, False, None) == [date(2026, 1, 9)]
+    assert _expand_target_days({"type": "unknown"}, monday, False, None) == [monday]
+
+
+def test_get_client_follows_configured_api_key(monkeypatch):
+    resolution_decomposer._client_for.cache_clear()
+    monkeypatch.setattr(settings, "openai_api_key", None)
+    assert resolution_decomposer._get_client() is None
+
+    monkeypatch.setattr(settings, "openai_api_key", "key-one")
+    first = resolution_decomposer._get_client()
+    assert first is not None
+    assert resolution_decomposer._get_client() is first
+
+    monkeypatch.setattr(settings, "openai_api_key", "key-two")
+    assert resolution_decomposer._get_client() is not first
+    resolution_decomposer._client_for.cache_clear()
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import threading
 from datetime import datetime
 from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
 from app.worker import scheduler_main
 
 
+@pytest.fixture()
+def dummy_scheduler(monkeypatch):
+    scheduler = MagicMock(spec=scheduler_main.BackgroundScheduler)
+    scheduler.running = False
+    monkeypatch.setattr(
+        scheduler_main,
+        "BackgroundScheduler",
+        MagicMock(spec=scheduler_main.BackgroundScheduler, return_value=scheduler),
+    )
+    return scheduler
+
+
+@pytest.fixture()
+def dummy_trace(monkeypatch):
+    trace = MagicMock(spec=scheduler_main.trace)
+    monkeypatch.setattr(scheduler_main, "trace", trace)
+    return trace
+
+
 def _set_valid_schedule(monkeypatch):
     monkeypatch.setattr(scheduler_main.settings, "weekly_job_day", 6)
     monkeypatch.setattr(scheduler_main.settings, "weekly_job_hour", 9)
@@ -24,81 +45,76 @@ def test_worker_warns_when_disabled(monkeypatch, caplog):
     assert "SCHEDULER_ENABLED=false" in caplog.text
 
 
-def test_worker_logs_schedule_when_enabled(monkeypatch, caplog):
+def test_worker_logs_schedule_when_enabled(monkeypatch, caplog, dummy_scheduler):
     _set_valid_schedule(monkeypatch)
     monkeypatch.setattr(scheduler_main.settings, "scheduler_enabled", True)
     monkeypatch.setattr(scheduler_main.settings, "jobs_run_on_startup", False)
     monkeypatch.setattr(scheduler_main, "init_opik", lambda: None)
-
-    class DummyScheduler:
-        def __init__(self, timezone=None):
-            self.running = False
-
-        def add_job(self, *args, **kwargs):
-            return None
-
-        def start(self):
-            self.running = True
-
-        def shutdown(self, wait=False):
-            self.running = False
-
-    monkeypatch.setattr(scheduler_main, "BackgroundScheduler", DummyScheduler)
-    monkeypatch.setattr(scheduler_main, "_wait_forever", lambda event: None)
-    monkeypatch.setattr(scheduler_main.signal, "signal", lambda *args, **kwargs: None)
+    stop_event = threading.Event()
+    stop_event.set()
 
     caplog.set_level("INFO")
-    scheduler_main.main()
+    scheduler_main.main(stop_event=stop_event)
+    assert dummy_scheduler.add_job.call_count == 3
+    dummy_scheduler.start.assert_called_once_with()
     assert "Scheduler enabled" in caplog.text
-    assert "Registered scheduler jobs" in caplog.text
+    assert "Registered jobs" in caplog.text
 
 
-def test_job_execution_emits_metrics(monkeypatch):
-    metrics = []
-    monkeypatch.setattr(
-        scheduler_main,
-        "log_metric",
-        lambda name, value, metadata=None: metrics.append((name, value, metadata)),
-    )
-
-    traces = []
+def test_job_execution_emits_metrics(monkeypatch, dummy_trace):
+    log_metrics = MagicMock(spec=scheduler_main.log_metrics)
+    monkeypatch.setattr(scheduler_main, "log_metrics", log_metrics)
+    session = MagicMock()
+    monkeypatch.setattr(scheduler_main, "SessionLocal", MagicMock(return_value=session))
 
-    class DummyTrace:
-        def __init__(self, *args, **kwargs):
-            traces.append(kwargs)
+    def fake_runner(session):
+        return SimpleNamespace(users_processed=2, snapshots_written=1)
 
-        def __enter__(self):
-            return self
+    monkeypatch.setattr(scheduler_main, "run_weekly_plan_for_all_users", fake_runner)
+    scheduler_main._run_weekly_plan_job()
+    dummy_trace.assert_called_once()
+    assert dummy_trace.call_args.args == ("jobs.weekly_plan",)
+    session.close.assert_called_once_with()
+    log_metrics.assert_called_once()
+    name, values = log_metrics.call_args.args
+    assert (name, log_metrics.call_args.kwargs) == ("jobs", {"metadata": {"job": "weekly_plan"}})
+    assert values["jobs.success"] == 1
+    assert values["jobs.users_processed"] == 2
+
+
+@pytest.mark.parametrize(
+    "field,value",
+    [("weekly_job_day", 7), ("weekly_job_hour", 24), ("weekly_job_minute", 99)],
+)
+def test_validate_config_rejects(monkeypatch, field, value):
+    _set_valid_schedule(monkeypatch)
+    monkeypatch.setattr(scheduler_main.settings, field, value)
+    with pytest.raises(ValueError):
+        scheduler_main._validate_config()
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
 
-    monkeypatch.setattr(scheduler_main, "trace", lambda *args, **kwargs: DummyTrace(*args, **kwargs))
+def test_startup_jobs_run_concurrently(monkeypatch):
+    # Each job blocks until all three have started, so a serial run would break the barrier.
+    barrier = threading.Barrier(3, timeout=5)
+    ran = []
 
-    class DummySession:
-        def close(self):
-            return None
+    def make_job(name):
+        def job():
+            barrier.wait()
+            ran.append(name)
 
-    monkeypatch.setattr(scheduler_main, "SessionLocal", lambda: DummySession())
+        return job
 
-    def fake_runner(session):
-        return SimpleNamespace(users_processed=2, snapshots_written=1)
+    monkeypatch.setattr(scheduler_main, "_run_weekly_plan_job", make_job("weekly_plan"))
+    monkeypatch.setattr(scheduler_main, "_run_intervention_job", make_job("interventions"))
+    monkeypatch.setattr(scheduler_main, "_run_task_reminder_job", make_job("task_reminders"))
 
-    monkeypatch.setattr(scheduler_main, "run_weekly_plan_for_all_users", fake_runner)
-    scheduler_main._run_weekly_plan_job()
-    assert traces, "trace should be recorded"
-    assert any(name == "jobs.success" for name, _, _ in metrics)
+    scheduler_main._run_startup_jobs()
+    assert sorted(ran) == ["interventions", "task_reminders", "weekly_plan"]
 
 
-def test_validate_config_errors(monkeypatch):
-    monkeypatch.setattr(scheduler_main.settings, "weekly_job_day", 7)
-    with pytest.raises(ValueError):
-        scheduler_main._validate_config()
-    monkeypatch.setattr(scheduler_main.settings, "weekly_job_day", 0)
-    monkeypatch.setattr(scheduler_main.settings, "weekly_job_hour", 24)
-    with pytest.raises(ValueError):
-        scheduler_main._validate_config()
-    monkeypatch.setattr(scheduler_main.settings, "weekly_job_hour", 0)
-    monkeypatch.setattr(scheduler_main.settings, "weekly_job_minute", 99)
-    with pytest.raises(ValueError):
-        scheduler_main._validate_config()
+def test_wait_forever_returns_when_stop_event_set_from_another_thread():
+    stop_event = threading.Event()
+    threading.Timer(0.05, stop_event.set).start()
+    scheduler_main._wait_forever(stop_event)
+    assert stop_event.is_set()
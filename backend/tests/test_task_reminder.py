@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.models.notification_token import NotificationToken
+from app.db.models.resolution import Resolution
+from app.db.models.task import Task
+from app.db.models.user import User
+from app.db.models.user_preferences import UserPreferences
+from app.services import task_reminder
+
+
+def _session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    TestingSession = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    User.__table__.create(bind=engine)
+    Resolution.__table__.create(bind=engine)
+    Task.__table__.create(bind=engine)
+    UserPreferences.__table__.create(bind=engine)
+    NotificationToken.__table__.create(bind=engine)
+    return TestingSession
+
+
+def _seed_due_task(session, *, paused: bool = False, due_in: timedelta = timedelta(minutes=10)):
+    user_id = uuid4()
+    session.add(User(id=user_id))
+    session.flush()
+    session.add(NotificationToken(user_id=user_id, token=f"ExponentPushToken[{user_id}]", active=True))
+    session.add(Resolution(user_id=user_id, title="Run a 10k", type="health", duration_weeks=8, status="active"))
+    if paused:
+        session.add(UserPreferences(user_id=user_id, coaching_paused=True))
+    due = datetime.now(ZoneInfo(settings.scheduler_timezone)) + due_in
+    task = Task(user_id=user_id, title="Tempo run", scheduled_day=due.date(), scheduled_time=due.time().replace(microsecond=0))
+    session.add(task)
+    session.commit()
+    return task.id
+
+
+def test_task_reminder_check_sends_once_per_task(monkeypatch):
+    SessionLocal = _session()
+    monkeypatch.setattr(settings, "notifications_enabled", True)
+    monkeypatch.setattr(settings, "task_reminder_lookahead_minutes", 30)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    sent = []
+    monkeypatch.setattr(task_reminder, "_dispatch", lambda client, payloads: sent.append(payloads))
+
+    session = SessionLocal()
+    try:
+        first_id = _seed_due_task(session)
+        second_id = _seed_due_task(session)
+        paused_id = _seed_due_task(session, paused=True)
+        later_id = _seed_due_task(session, due_in=timedelta(hours=3))
+
+        stats = task_reminder.run_task_reminder_check(session)
+        assert stats.users_processed == 2
+        assert stats.snapshots_written == 2
+        # Both reminders go out in a single push request.
+        assert len(sent) == 1
+        assert len(sent[0]) == 2
+        assert all("Run a 10k" in payload["body"] for payload in sent[0])
+
+        for task_id in (first_id, second_id):
+            assert session.get(Task, task_id).metadata_json.get("reminder_sent_at")
+        for task_id in (paused_id, later_id):
+            assert not (session.get(Task, task_id).metadata_json or {}).get("reminder_sent_at")
+
+        # A second run must not resend reminders for the same tasks.
+        task_reminder.run_task_reminder_check(session)
+        assert len(sent) == 1
+    finally:
+        session.close()
+
+
+def test_reminder_batches_keep_task_payloads_together():
+    queued = [
+        task_reminder.QueuedReminder(candidate=None, payloads=[{"to": str(i)}] * size)
+        for i, size in enumerate((60, 30, 20, 100))
+    ]
+    batches = list(task_reminder._batch_by_message_count(queued, 100))
+    assert [[len(reminder.payloads) for reminder in batch] for batch in batches] == [[60, 30], [20], [100]]
+
+
+def test_generate_messages_fans_out_llm_calls(monkeypatch):
+    in_flight = {"current": 0, "peak": 0}
+
+    class FakeCompletions:
+        async def create(self, **kwargs):
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            title = kwargs["messages"][1]["content"].splitlines()[0]
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" {title} "))])
+
+    client_options = []
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            client_options.append(kwargs)
+            self.chat = SimpleNamespace(completions=FakeCompletions())
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(task_reminder.openai, "AsyncOpenAI", FakeAsyncOpenAI)
+    now = datetime.now(timezone.utc)
+    candidates = [
+        task_reminder.ReminderCandidate(task=Task(user_id=uuid4(), title=f"Task {i}"), scheduled_at=now, metadata={})
+        for i in range(5)
+    ]
+
+    messages = task_reminder._generate_messages(candidates, {})
+
+    assert messages == [f"Task: Task {i}" for i in range(5)]
+    assert in_flight["peak"] > 1
+    assert [options["max_retries"] for options in client_options] == [2]
+    assert client_options[0]["timeout"].read == 60.0
+
+
+def test_scheduled_at_utc_is_stable_when_scheduler_zone_differs_from_db_zone(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_timezone", "America/New_York")
+    session = _session()()
+    user_id = uuid4()
+    session.add(User(id=user_id))
+    session.flush()
+    task = Task(user_id=user_id, title="Tempo run", scheduled_day=date(2026, 7, 1), scheduled_time=time(9, 0))
+    session.add(task)
+    session.flush()
+
+    expected = datetime(2026, 7, 1, 13, 0, tzinfo=timezone.utc)
+    # The naive time is written with the scheduler zone's offset, not left for the DB session zone to fill in.
+    assert task.scheduled_time.utcoffset() == timedelta(hours=-4)
+    session.commit()
+
+    # A later unrelated edit, as after Postgres reloads the stored timetz, must not move the instant.
+    task.scheduled_time = time(9, 0, tzinfo=timezone(timedelta(hours=-4)))
+    task.metadata_json = {"note": "moved to the park"}
+    session.commit()
+    stored = session.get(Task, task.id).scheduled_at_utc
+    assert stored.replace(tzinfo=stored.tzinfo or timezone.utc) == expected
+    session.close()